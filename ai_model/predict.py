@@ -30,22 +30,19 @@ class PopStarPredictor:
             _, predicted = torch.max(output, 1)
         return predicted.item()
 
-    def predict_board(self, screenshot_path, grid_box):
+    def predict_grid(self, grid_img, rows=10, cols=10):
         """
-        从截图和格子区域识别整个棋盘
-        grid_box: (x, y, w, h)
+        将棋盘区域图像按 rows x cols 均分并逐格识别
+        grid_img: 仅包含棋盘区域的 PIL Image
         """
-        img = Image.open(screenshot_path).convert('RGB')
-        x, y, w, h = grid_box
-        grid_img = img.crop((x, y, x + w, y + h))
-        
-        cell_w = w / 10
-        cell_h = h / 10
+        w, h = grid_img.size
+        cell_w = w / cols
+        cell_h = h / rows
         
-        matrix = np.full((10, 10), -1, dtype=int)
+        matrix = np.full((rows, cols), -1, dtype=int)
         
-        for r in range(10):
-            for c in range(10):
+        for r in range(rows):
+            for c in range(cols):
                 left = c * cell_w
                 top = r * cell_h
                 right = left + cell_w
@@ -61,6 +58,17 @@ class PopStarPredictor:
                     matrix[r, c] = -1
         return matrix
 
+    def predict_board(self, screenshot_path, grid_box, rows=10, cols=10):
+        """
+        从截图和格子区域识别整个棋盘
+        grid_box: (x, y, w, h)
+        rows, cols: 棋盘行数与列数
+        """
+        img = Image.open(screenshot_path).convert('RGB')
+        x, y, w, h = grid_box
+        grid_img = img.crop((x, y, x + w, y + h))
+        return self.predict_grid(grid_img, rows, cols)
+
 if __name__ == "__main__":
     # 示例用法
     # predictor = PopStarPredictor()
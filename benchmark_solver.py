@@ -1,17 +1,18 @@
-
 import time
+import numpy as np
 from game.engine import PopStarEngine
 from game.solver import PopStarSolver
 
-def run_benchmark(iterations=50000, silent=False):
+def run_benchmark(iterations=50000, silent=False, size=10, **options):
     """
     运行性能测试并返回 IPS (每秒迭代次数)
+    options 会传给 PopStarSolver (例如 strategy="beam", beam_width=256)
     """
-    engine = PopStarEngine()
-    solver = PopStarSolver(engine)
+    engine = PopStarEngine(width=size, height=size)
+    solver = PopStarSolver(engine, **options)
     
     if not silent:
-        print(f"正在运行性能测试，模拟次数: {iterations} ...")
+        print(f"正在运行性能测试，棋盘 {size}x{size}，模拟次数: {iterations} ...")
     
     start_time = time.time()
     # 执行求解
@@ -25,9 +26,108 @@ def run_benchmark(iterations=50000, silent=False):
         print(f"模拟次数: {iterations}")
         print(f"耗时: {duration:.4f}秒")
         print(f"性能 (IPS): {ips:.2f} 次/秒")
+        print(f"搜索树内存: {solver.last_tree_bytes / 1024 / 1024:.2f} MB")
         print(f"推荐移动: {move}, 预测总分: {score}")
         
     return ips
 
+def run_size_benchmark(sizes=(8, 10, 12, 15, 20), iterations=50000):
+    """
+    对比不同棋盘尺寸下的吞吐量与搜索树内存随棋盘面积的变化
+    """
+    print(f"{'尺寸':>6} {'面积':>6} {'IPS':>12} {'内存(MB)':>10} {'字节/迭代':>10}")
+    results = []
+    for size in sizes:
+        engine = PopStarEngine(width=size, height=size)
+        solver = PopStarSolver(engine)
+        start_time = time.time()
+        solver.solve(iterations=iterations)
+        duration = time.time() - start_time
+        ips = iterations / duration
+        mem = solver.last_tree_bytes
+        print(f"{size:>3}x{size:<2} {size * size:>6} {ips:>12.0f} {mem / 1024 / 1024:>10.2f} {mem / iterations:>10.0f}")
+        results.append((size, ips, mem))
+    return results
+
+# MCTS 搜索参数对比 (名称 -> PopStarSolver 的 options)
+# 归一化后的 exploration 是相对于已观测得分区间 (max - min) 的比例，不再依赖具体的得分规模；
+# rave_equivalence (k) 越小，AMAF 估值随访问次数增加被放弃得越早。
+# 以下取值仅为初始设定，需编译扩展后用 run_config_benchmark() 在目标语料上验证。
+SOLVER_CONFIGS = {
+    "UCB1 (C=100)": {},
+    "归一化 C": {"normalize_exploration": True, "exploration": 0.03},
+    "归一化 C + RAVE": {"normalize_exploration": True, "exploration": 0.03,
+                        "rave": True, "rave_equivalence": 300.0},
+    "归一化 C + RAVE + 渐进展开": {"normalize_exploration": True, "exploration": 0.05,
+                                  "rave": True, "widening": True},
+}
+
+def run_config_benchmark(configs=None, boards=16, iterations=20000,
+                         checkpoints=(1000, 2000, 5000, 10000, 20000),
+                         targets=(4000, 4500, 5000), seed=0):
+    """
+    在固定的随机棋盘语料上对比不同搜索参数:
+    - 各迭代次数检查点下的平均最高分
+    - 达到基准配置 (第一个配置) 最终得分所需的平均迭代次数
+      (基准自身的值只是其停滞前的迭代次数，仅供参考)
+    - 达到各固定目标分数所需的平均迭代次数
+    未达到目标的按 iterations 计。
+    """
+    configs = configs or SOLVER_CONFIGS
+    rng = np.random.default_rng(seed)
+    corpus = [rng.integers(0, 5, (10, 10)) for _ in range(boards)]
+    traces = {}
+    for name, options in configs.items():
+        traces[name] = []
+        for board in corpus:
+            solver = PopStarSolver(PopStarEngine(board=board), **options)
+            solver.solve(iterations=iterations)
+            traces[name].append(solver.last_trace)
+
+    def best_at(trace, n):
+        return max((score for i, score in trace if i <= n), default=0)
+
+    def reach(trace, target):
+        return next((i for i, score in trace if score >= target), iterations)
+
+    baseline = [best_at(t, iterations) for t in next(iter(traces.values()))]
+    header = " ".join(f"{n:>7}" for n in checkpoints)
+    target_header = " ".join(f"{'达到' + str(t):>10}" for t in targets)
+    print(f"{'配置':<28} {header} {'达到基准':>10} {target_header}")
+    for name, config_traces in traces.items():
+        means = [np.mean([best_at(t, n) for t in config_traces]) for n in checkpoints]
+        to_baseline = np.mean([reach(t, target) for t, target in zip(config_traces, baseline)])
+        to_targets = [np.mean([reach(t, target) for t in config_traces]) for target in targets]
+        row = " ".join(f"{m:>7.0f}" for m in means)
+        target_row = " ".join(f"{m:>10.0f}" for m in to_targets)
+        print(f"{name:<28} {row} {to_baseline:>10.0f} {target_row}")
+    return traces
+
+def run_strategy_benchmark(boards=16, iterations=50000, beam_widths=(64, 256, 1024), seed=0):
+    """
+    在固定语料上对比 MCTS 与不同束宽的束搜索: 平均得分与平均耗时
+    """
+    rng = np.random.default_rng(seed)
+    corpus = [rng.integers(0, 5, (10, 10)) for _ in range(boards)]
+    strategies = {f"MCTS ({iterations} 次)": {}}
+    strategies.update({f"束搜索 (宽度 {w})": {"strategy": "beam", "beam_width": w}
+                       for w in beam_widths})
+    print(f"{'策略':<24} {'平均得分':>10} {'平均耗时(秒)':>12}")
+    for name, options in strategies.items():
+        scores, durations = [], []
+        for board in corpus:
+            solver = PopStarSolver(PopStarEngine(board=board), **options)
+            start_time = time.time()
+            _, score, _ = solver.solve(iterations=iterations)
+            durations.append(time.time() - start_time)
+            scores.append(score)
+        print(f"{name:<24} {np.mean(scores):>10.1f} {np.mean(durations):>12.3f}")
+
 if __name__ == "__main__":
     run_benchmark()
+    print()
+    run_size_benchmark()
+    print()
+    run_config_benchmark()
+    print()
+    run_strategy_benchmark()
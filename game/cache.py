@@ -0,0 +1,184 @@
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# 文件头: 魔数 + 版本
+_MAGIC = b"PSC1"
+# 单条记录头: 16 字节盘面哈希, int32 得分, uint16 路径长度
+_RECORD = struct.Struct("<16siH")
+
+
+def canonical_key(board):
+    """
+    计算棋盘的规范哈希。
+
+    颜色按行优先顺序的首次出现重新编号 (颜色互换后的盘面共享同一解)，
+    并把棋盘尺寸一并编码，避免不同尺寸的盘面发生碰撞。
+    """
+    board = np.asarray(board)
+    flat = board.astype(np.int8).ravel()
+    canon = np.full_like(flat, -1)
+    present = flat != -1
+    colors, first = np.unique(flat[present], return_index=True)
+    for new_color, old_color in enumerate(colors[np.argsort(first)]):
+        canon[flat == old_color] = new_color
+    header = struct.pack("<HH", *board.shape)
+    return hashlib.blake2b(header + canon.tobytes(), digest_size=16).digest()
+
+
+class SolutionCache:
+    """
+    已解盘面缓存
+
+    - 内存 LRU: 命中时直接返回，不触碰磁盘
+    - 磁盘存储: 仅追加的记录文件，通过 mmap 读取；打开时扫描一遍建立 key -> 偏移 的索引
+    - 合并策略: 同一盘面只在新结果得分更高时追加新记录，索引始终指向最优记录
+
+    得分为"从该盘面出发"可获得的分数 (含结束奖励)，不包含之前已获得的总分。
+    """
+
+    def __init__(self, path=None, capacity=4096):
+        self.path = path
+        self.capacity = capacity
+        self._lru = OrderedDict()
+        self._index = {}  # key -> (score, offset)
+        self._lock = threading.Lock()
+        self._file = None
+        self._mm = None
+        self._mm_dirty = False
+        if path is not None:
+            self._open_store(path)
+
+    # ---------- 磁盘存储 ----------
+
+    def _open_store(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a+b")
+        self._file.seek(0, os.SEEK_END)
+        if self._file.tell() == 0:
+            self._file.write(_MAGIC)
+            self._file.flush()
+        self._remap()
+        if self._mm[:len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"无效的缓存文件: {path}")
+        end = self._scan()
+        # 丢弃上次写入中断留下的残缺记录，保证后续追加对齐
+        if end < len(self._mm):
+            self._mm.close()
+            self._mm = None
+            self._file.truncate(end)
+            self._remap()
+
+    def _remap(self):
+        if self._mm is not None:
+            self._mm.close()
+        self._file.flush()
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mm_dirty = False
+
+    def _scan(self):
+        """顺序扫描记录文件建立索引，返回最后一条完整记录的结束偏移"""
+        mm = self._mm
+        offset = len(_MAGIC)
+        size = len(mm)
+        while offset + _RECORD.size <= size:
+            key, score, n = _RECORD.unpack_from(mm, offset)
+            end = offset + _RECORD.size + 2 * n
+            if end > size:
+                break
+            known = self._index.get(key)
+            if known is None or score > known[0]:
+                self._index[key] = (score, offset)
+            offset = end
+        return offset
+
+    def _read_record(self, offset):
+        if self._mm_dirty:
+            self._remap()
+        _, score, n = _RECORD.unpack_from(self._mm, offset)
+        start = offset + _RECORD.size
+        cells = self._mm[start:start + 2 * n]
+        path = [(cells[i], cells[i + 1]) for i in range(0, 2 * n, 2)]
+        return score, path
+
+    def _append_record(self, key, score, path):
+        offset = self._file.seek(0, os.SEEK_END)
+        cells = bytes(v for move in path for v in move)
+        self._file.write(_RECORD.pack(key, score, len(path)) + cells)
+        self._file.flush()
+        self._mm_dirty = True
+        return offset
+
+    # ---------- 公共接口 ----------
+
+    def get(self, board):
+        """查询盘面，命中返回 (score, path)，否则返回 None"""
+        key = canonical_key(board)
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                self._lru.move_to_end(key)
+                return entry[0], list(entry[1])
+            known = self._index.get(key)
+            if known is None:
+                return None
+            entry = self._read_record(known[1])
+            self._remember(key, entry)
+            return entry[0], list(entry[1])
+
+    def put(self, board, score, path):
+        """
+        写入一个解。仅当比已缓存结果更好时才生效。
+
+        返回:
+            bool: 缓存是否被更新
+        """
+        key = canonical_key(board)
+        path = [(int(r), int(c)) for r, c in path]
+        score = int(score)
+        with self._lock:
+            scores = [e[0] for e in (self._lru.get(key), self._index.get(key)) if e is not None]
+            if scores and score <= max(scores):
+                return False
+            if self._file is not None:
+                offset = self._append_record(key, score, path)
+                self._index[key] = (score, offset)
+            self._remember(key, (score, path))
+            return True
+
+    def _remember(self, key, entry):
+        self._lru[key] = entry
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.capacity:
+            self._lru.popitem(last=False)
+
+    def __contains__(self, board):
+        key = canonical_key(board)
+        with self._lock:
+            return key in self._lru or key in self._index
+
+    def __len__(self):
+        with self._lock:
+            return len(self._index) if self._file is not None else len(self._lru)
+
+    def close(self):
+        with self._lock:
+            if self._mm is not None:
+                self._mm.close()
+                self._mm = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,24 +1,27 @@
 import numpy as np
 
-class PopStarEngine:
+class PurePopStarEngine:
     """
-    消灭星星核心引擎
-    矩阵定义: 10x10, -1 表示空位, 0-4 表示五种颜色
+    消灭星星核心引擎 (纯 Python 实现)
+    矩阵定义: 默认 10x10, -1 表示空位, 0-4 表示五种颜色
+    棋盘尺寸由传入的 board 决定；随机初始化时可通过 width/height 指定
     """
     WIDTH = 10
     HEIGHT = 10
 
-    def __init__(self, board=None):
+    def __init__(self, board=None, width=None, height=None):
         if board is not None:
             self.board = np.array(board, dtype=int)
         else:
             # 随机初始化棋盘 (0-4)
-            self.board = np.random.randint(0, 5, (self.HEIGHT, self.WIDTH))
+            shape = (height or self.HEIGHT, width or self.WIDTH)
+            self.board = np.random.randint(0, 5, shape)
+        self.height, self.width = self.board.shape
         self.score = 0
         self.total_score = 0
 
     def copy(self):
-        new_engine = PopStarEngine(board=self.board.copy())
+        new_engine = PurePopStarEngine(board=self.board.copy())
         new_engine.score = self.score
         new_engine.total_score = self.total_score
         return new_engine
@@ -37,7 +40,7 @@ class PopStarEngine:
             curr_r, curr_c = stack.pop()
             for dr, dc in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
                 nr, nc = curr_r + dr, curr_c + dc
-                if 0 <= nr < self.HEIGHT and 0 <= nc < self.WIDTH:
+                if 0 <= nr < self.height and 0 <= nc < self.width:
                     if self.board[nr, nc] == color and (nr, nc) not in group:
                         group.add((nr, nc))
                         stack.append((nr, nc))
@@ -73,24 +76,24 @@ class PopStarEngine:
 
     def _apply_gravity(self):
         """每一列方块向下掉落"""
-        for c in range(self.WIDTH):
+        for c in range(self.width):
             # 获取当前列所有非空元素
             col = self.board[:, c]
             remaining = col[col != -1]
             # 填充到最底端
-            new_col = np.full(self.HEIGHT, -1, dtype=int)
-            new_col[self.HEIGHT - len(remaining):] = remaining
+            new_col = np.full(self.height, -1, dtype=int)
+            new_col[self.height - len(remaining):] = remaining
             self.board[:, c] = new_col
 
     def _apply_column_shift(self):
         """如果某一列全空，右侧列整体向左移"""
         non_empty_cols = []
-        for c in range(self.WIDTH):
+        for c in range(self.width):
             if not np.all(self.board[:, c] == -1):
                 non_empty_cols.append(self.board[:, c])
         
         # 重新构建棋盘
-        new_board = np.full((self.HEIGHT, self.WIDTH), -1, dtype=int)
+        new_board = np.full((self.height, self.width), -1, dtype=int)
         for i, col_data in enumerate(non_empty_cols):
             new_board[:, i] = col_data
         self.board = new_board
@@ -109,21 +112,181 @@ class PopStarEngine:
 
     def has_moves(self):
         """判断是否还有可消除的动作"""
-        for r in range(self.HEIGHT):
-            for c in range(self.WIDTH):
+        for r in range(self.height):
+            for c in range(self.width):
                 if self.board[r, c] != -1:
                     # 检查相邻
                     color = self.board[r, c]
                     for dr, dc in [(0, 1), (1, 0)]:
                         nr, nc = r + dr, c + dc
-                        if 0 <= nr < self.HEIGHT and 0 <= nc < self.WIDTH:
+                        if 0 <= nr < self.height and 0 <= nc < self.width:
                             if self.board[nr, nc] == color:
                                 return True
         return False
 
     def __str__(self):
         res = []
-        for r in range(self.HEIGHT):
+        for r in range(self.height):
             row_str = " ".join([str(x) if x != -1 else "." for x in self.board[r]])
             res.append(row_str)
         return "\n".join(res)
+
+
+try:
+    # 优先使用 Rust 实现 (接口一致)，未编译扩展时回退到纯 Python 实现
+    from popstar_rs import PyPopStarEngine as PopStarEngine
+except ImportError:
+    PopStarEngine = PurePopStarEngine
+
+
+class BatchPopStarEngine:
+    """
+    向量化的多棋盘引擎
+    同时持有 N 个棋盘 (N, H, W) int8 数组，所有核心操作在 N 个棋盘上一次性完成，
+    没有 Python 层的逐格/逐列循环。规则与 PurePopStarEngine 完全一致。
+    """
+    WIDTH = PurePopStarEngine.WIDTH
+    HEIGHT = PurePopStarEngine.HEIGHT
+
+    def __init__(self, boards=None, n=1, width=None, height=None):
+        if boards is not None:
+            self.boards = np.array(boards, dtype=np.int8)
+            if self.boards.ndim == 2:
+                self.boards = self.boards[None]
+        else:
+            # 随机初始化 n 个棋盘 (0-4)
+            shape = (n, height or self.HEIGHT, width or self.WIDTH)
+            self.boards = np.random.randint(0, 5, shape).astype(np.int8)
+        self.score = np.zeros(len(self.boards), dtype=np.int64)
+        self.total_score = np.zeros(len(self.boards), dtype=np.int64)
+
+    @classmethod
+    def from_engines(cls, engines):
+        """由若干单棋盘引擎构造 (保留各自的分数)"""
+        batch = cls(boards=np.stack([e.board for e in engines]))
+        batch.score[:] = [e.score for e in engines]
+        batch.total_score[:] = [e.total_score for e in engines]
+        return batch
+
+    def engine(self, i):
+        """取出第 i 个棋盘对应的单棋盘引擎 (纯 Python 实现，支持任意尺寸)"""
+        single = PurePopStarEngine(board=self.boards[i])
+        single.score = int(self.score[i])
+        single.total_score = int(self.total_score[i])
+        return single
+
+    def __len__(self):
+        return len(self.boards)
+
+    def copy(self):
+        new_batch = BatchPopStarEngine(boards=self.boards.copy())
+        new_batch.score = self.score.copy()
+        new_batch.total_score = self.total_score.copy()
+        return new_batch
+
+    def label_components(self):
+        """
+        同色连通区域标记
+        每个连通区域以其内部最小的一维索引 (r * W + c) 作为标签，空位为 -1。
+        通过四邻域的最小标签传播迭代到收敛，每轮同时处理全部棋盘。
+        """
+        b = self.boards
+        n, h, w = b.shape
+        empty = b == -1
+        sentinel = h * w
+        labels = np.broadcast_to(np.arange(h * w, dtype=np.int16).reshape(h, w), b.shape).copy()
+        labels[empty] = sentinel
+
+        # 相邻同色关系 (静态，只需计算一次)
+        same_v = (b[:, 1:, :] == b[:, :-1, :]) & ~empty[:, 1:, :]
+        same_h = (b[:, :, 1:] == b[:, :, :-1]) & ~empty[:, :, 1:]
+
+        while True:
+            prev = labels.copy()
+            # 上下传播
+            np.minimum(labels[:, 1:, :], np.where(same_v, labels[:, :-1, :], sentinel), out=labels[:, 1:, :])
+            np.minimum(labels[:, :-1, :], np.where(same_v, labels[:, 1:, :], sentinel), out=labels[:, :-1, :])
+            # 左右传播
+            np.minimum(labels[:, :, 1:], np.where(same_h, labels[:, :, :-1], sentinel), out=labels[:, :, 1:])
+            np.minimum(labels[:, :, :-1], np.where(same_h, labels[:, :, 1:], sentinel), out=labels[:, :, :-1])
+            if np.array_equal(labels, prev):
+                break
+
+        labels[empty] = -1
+        return labels
+
+    def group_sizes(self, labels=None):
+        """每个格子所在连通区域的大小 (N, H, W)，空位为 0"""
+        if labels is None:
+            labels = self.label_components()
+        n, h, w = labels.shape
+        valid = labels >= 0
+        # 以 (棋盘序号, 标签) 组合为全局键统计大小
+        keys = np.arange(n).reshape(n, 1, 1) * (h * w) + labels
+        counts = np.bincount(keys[valid], minlength=n * h * w)
+        return np.where(valid, counts[np.where(valid, keys, 0)], 0)
+
+    def move_mask(self):
+        """可消除格子掩码 (N, H, W): 所在连通区域大小 >= 2"""
+        return self.group_sizes() >= 2
+
+    def has_moves(self):
+        """每个棋盘是否还有可消除的动作 (N,)"""
+        b = self.boards
+        vertical = (b[:, 1:, :] == b[:, :-1, :]) & (b[:, 1:, :] != -1)
+        horizontal = (b[:, :, 1:] == b[:, :, :-1]) & (b[:, :, 1:] != -1)
+        return vertical.any(axis=(1, 2)) | horizontal.any(axis=(1, 2))
+
+    def eliminate(self, rows, cols):
+        """
+        在每个棋盘上分别点击 (rows[i], cols[i])，返回每个棋盘本次消除得分 (N,)
+        点击空位或连通数 < 2 的棋盘保持不变，得分为 0。
+        """
+        n = len(self.boards)
+        rows = np.broadcast_to(np.asarray(rows, dtype=np.intp), (n,))
+        cols = np.broadcast_to(np.asarray(cols, dtype=np.intp), (n,))
+        idx = np.arange(n)
+
+        labels = self.label_components()
+        sizes = self.group_sizes(labels)
+        target = labels[idx, rows, cols]
+        group_n = sizes[idx, rows, cols]
+        active = (target >= 0) & (group_n >= 2)
+
+        # 1. 计算得分
+        move_score = np.where(active, group_n.astype(np.int64) ** 2 * 5, 0)
+        self.score += move_score
+        self.total_score += move_score
+
+        # 2. 标记消除
+        removed = (labels == target.reshape(n, 1, 1)) & active.reshape(n, 1, 1)
+        self.boards[removed] = -1
+
+        # 3. 应用重力 (方块掉落)
+        self._apply_gravity()
+
+        # 4. 列合并 (向左合并空列)
+        self._apply_column_shift()
+
+        return move_score
+
+    def _apply_gravity(self):
+        """按"是否非空"做稳定排序: 空位排到顶部，非空方块保持相对顺序落到底部"""
+        order = np.argsort(self.boards != -1, axis=1, kind="stable")
+        self.boards = np.take_along_axis(self.boards, order, axis=1)
+
+    def _apply_column_shift(self):
+        """按"是否全空列"做稳定排序: 非空列保持顺序左移，空列移到右侧"""
+        empty_cols = np.all(self.boards == -1, axis=1)
+        order = np.argsort(empty_cols, axis=1, kind="stable")
+        self.boards = np.take_along_axis(self.boards, order[:, None, :], axis=2)
+
+    def get_remaining_count(self):
+        """每个棋盘剩余星星数量 (N,)"""
+        return np.sum(self.boards != -1, axis=(1, 2))
+
+    def calculate_end_bonus(self):
+        """每个棋盘的关卡结束奖励 (N,)"""
+        rem = self.get_remaining_count().astype(np.int64)
+        bonus = np.maximum(0, 2000 - rem * rem * 20)
+        return np.where(rem >= 10, 0, bonus)
@@ -0,0 +1,31 @@
+import numpy as np
+
+
+def move_mask(engine):
+    """单棋盘引擎的可消除格子掩码 (H, W)，与 BatchPopStarEngine.move_mask() 中单个棋盘的结果一致"""
+    board = engine.board
+    mask = np.zeros(board.shape, dtype=bool)
+    for r, c in zip(*np.nonzero(board != -1)):
+        if not mask[r, c]:
+            group = engine.get_connected_group(r, c)
+            if len(group) >= 2:
+                mask[tuple(np.transpose(list(group)))] = True
+    return mask
+
+
+def random_cell(mask, rng):
+    """在掩码为 True 的格子中随机选择一个 (r, c)，没有可选格子时返回 None"""
+    cells = np.argwhere(mask)
+    if len(cells) == 0:
+        return None
+    r, c = cells[rng.integers(len(cells))]
+    return int(r), int(c)
+
+
+def random_moves(engine, rng):
+    """
+    随机合法动作生成器: 每次按引擎当前局面给出一个可消除位置，直到无动作可走
+    调用方需在每次取出动作后自行执行消除 (否则局面不变)。
+    """
+    while engine.has_moves():
+        yield random_cell(move_mask(engine), rng)
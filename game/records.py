@@ -0,0 +1,107 @@
+import os
+import struct
+
+import numpy as np
+
+# 对局记录文件头: magic, version, width, height, max_moves, record_size, 保留
+# 格式定义与 popstar_rs/src/selfplay.rs 保持一致
+MAGIC = b"PSGR"
+VERSION = 1
+_HEADER = struct.Struct("<4sBBBBI4x")
+# 动作以单字节格子索引存储且 0xFF 保留为填充值，因此格子总数不能超过 255
+MAX_CELLS = 255
+
+
+def max_moves(width=10, height=10):
+    """每条记录预留的最大步数 (每步至少消除 2 个)"""
+    return width * height // 2
+
+
+def record_dtype(width=10, height=10):
+    """
+    单条对局记录的 NumPy 结构化类型 (紧凑排列，无对齐填充)
+    - board: 初始棋盘 (-1 为空)
+    - n_moves: 实际步数
+    - moves: 每步点击的格子索引 r * width + c，未使用部分为 0xFF
+    - move_scores: 每步得分
+    - bonus: 结束奖励
+    - total: 最终总分 (含结束奖励)
+    """
+    if width * height > MAX_CELLS:
+        raise ValueError(f"对局记录格式最多支持 {MAX_CELLS} 个格子，{width}x{height} 棋盘过大")
+    m = max_moves(width, height)
+    return np.dtype([
+        ("board", "i1", (height, width)),
+        ("n_moves", "u1"),
+        ("moves", "u1", (m,)),
+        ("move_scores", "<u4", (m,)),
+        ("bonus", "<u2"),
+        ("total", "<u4"),
+    ])
+
+
+def _header(width, height):
+    dtype = record_dtype(width, height)
+    return _HEADER.pack(MAGIC, VERSION, width, height, max_moves(width, height), dtype.itemsize)
+
+
+def open_records(path):
+    """
+    以只读 mmap 方式打开对局记录文件，返回结构化数组 (不解析、不拷贝)
+    末尾写入中断导致的残缺记录会被忽略。
+    """
+    with open(path, "rb") as f:
+        raw = f.read(_HEADER.size)
+    if len(raw) < _HEADER.size:
+        raise ValueError(f"无效的对局记录文件: {path}")
+    magic, version, width, height, _, size = _HEADER.unpack(raw)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"无效的对局记录文件: {path}")
+
+    dtype = record_dtype(width, height)
+    if size != dtype.itemsize:
+        raise ValueError(f"记录长度不匹配: 文件为 {size} 字节，期望 {dtype.itemsize} 字节")
+    count = (os.path.getsize(path) - _HEADER.size) // dtype.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=_HEADER.size, shape=(count,))
+
+
+def write_records(path, records, append=False):
+    """
+    将结构化数组 (dtype 见 record_dtype) 写入对局记录文件
+    主要用于 Python 侧生成或筛选后另存；大批量生成请使用 popstar_rs.generate_selfplay。
+    """
+    records = np.asarray(records)
+    height, width = records.dtype["board"].shape
+    if records.dtype != record_dtype(width, height):
+        raise ValueError("记录类型与 record_dtype 不一致")
+    if append and os.path.exists(path) and os.path.getsize(path) > 0:
+        with open(path, "rb") as f:
+            if f.read(_HEADER.size) != _header(width, height):
+                raise ValueError("已有记录文件的文件头不一致 (格式或棋盘尺寸不同)")
+        mode = "ab"
+    else:
+        mode = "wb"
+    with open(path, mode) as f:
+        if mode == "wb":
+            f.write(_header(width, height))
+        f.write(records.tobytes())
+
+
+def record_path(record):
+    """将单条记录的动作序列解码为 [(r, c), ...]"""
+    width = record["board"].shape[1]
+    cells = record["moves"][:record["n_moves"]]
+    return [(int(i) // width, int(i) % width) for i in cells]
+
+
+if __name__ == "__main__":
+    import sys
+    import popstar_rs
+
+    out = sys.argv[1] if len(sys.argv) > 1 else "selfplay.psgr"
+    n = popstar_rs.generate_selfplay(out, games=100, iterations=2000)
+    records = open_records(out)
+    print(f"写入 {n} 局，共 {len(records)} 局，平均总分 {records['total'].mean():.1f}，"
+          f"平均步数 {records['n_moves'].mean():.1f}")
@@ -4,32 +4,78 @@ except ImportError:
     raise ImportError("Rust 扩展 module 'popstar_rs' 未找到。请先编译并安装：maturin develop --release")
 
 class PopStarSolver:
-    def __init__(self, engine):
+    def __init__(self, engine, cache=None, **options):
+        """
+        参数:
+            engine: 当前游戏引擎
+            cache (SolutionCache): 可选的已解盘面缓存 (见 game/cache.py)
+            **options: 传给 Rust 求解器的参数，例如
+                strategy: "mcts" (默认) 或 "beam"，两者返回格式相同
+                beam_width: 束搜索的束宽 (束搜索忽略 iterations)
+                exploration / normalize_exploration: UCB 探索系数及是否按得分区间归一化
+                rave / rave_equivalence: 是否启用 RAVE (AMAF) 统计及其等价参数 k
+                widening / widening_c / widening_alpha: 按连通组大小的渐进展开
+        """
         self.engine = engine
+        self.cache = cache
+        self.options = options
+        # 上一次求解时 Rust 搜索树的内存估算 (字节)，缓存命中时为 0
+        self.last_tree_bytes = 0
+        # 上一次求解的最高分收敛轨迹 [(迭代次数, 得分), ...]，得分不含之前的总分
+        self.last_trace = []
 
-    def solve(self, iterations=1000):
+    def solve(self, iterations=1000, refine=False):
         """
         使用 Rust 高性能求解器计算最佳移动。
         
         参数:
-            iterations (int): 模拟次数 (在 Rust 端通过 MCTS 迭代)
+            iterations (int): 模拟次数 (在 Rust 端通过 MCTS 迭代，束搜索时忽略)
+            refine (bool): 缓存命中时是否继续搜索 (以缓存路径作为得分下界)，
+                           为 False 时直接返回缓存结果
             
         返回:
             (move, max_score, path): 最佳移动, 预测总分, 完整路径
         """
-        # 转换板子数据: numpy (10,10) -> flat list
-        board_data = self.engine.board.flatten().tolist()
-        
-        # 创建 Rust 引擎快照
-        rs_engine = popstar_rs.PyPopStarEngine(board_data)
-        
         # 修正 Rust 引擎的分数，确保返回的总分正确
         current_base_score = self.engine.total_score
+
+        cached = self.cache.get(self.engine.board) if self.cache is not None else None
+        if cached is not None and not refine:
+            self.last_tree_bytes = 0
+            self.last_trace = []
+            cached_score, cached_path = cached
+            move = cached_path[0] if cached_path else None
+            return move, current_base_score + cached_score, cached_path
+
+        if isinstance(self.engine, popstar_rs.PyPopStarEngine):
+            # 原生引擎直接传入，无需转换棋盘 (Rust 端会自行克隆)；其得分已包含当前总分
+            rs_engine = self.engine
+            rs_base_score = current_base_score
+        else:
+            # 纯 Python 引擎: 创建 Rust 引擎快照 (常用尺寸走单态化版本，其余尺寸走通用引擎)
+            rs_engine = popstar_rs.PyPopStarEngine(self.engine.board)
+            rs_base_score = 0
         
-        rs_solver = popstar_rs.PyPopStarSolver()
-        move, rs_score, path = rs_solver.solve(rs_engine, iterations)
+        rs_solver = popstar_rs.PyPopStarSolver(**self.options)
+        seed_path = cached[1] if cached is not None else None
+        move, rs_score, path = rs_solver.solve(rs_engine, iterations, seed_path)
+        # 统一换算为"从当前局面出发"的得分
+        gained = rs_score - rs_base_score
+        self.last_tree_bytes = rs_solver.last_tree_bytes
+        self.last_trace = [(i, score - rs_base_score) for i, score in rs_solver.last_trace]
+
+        if self.cache is not None and path:
+            self._store_path(rs_engine, gained, path)
         
-        return move, current_base_score + rs_score, path
+        return move, current_base_score + gained, path
+
+    def _store_path(self, rs_engine, gained, path):
+        """将路径上经过的每个局面连同剩余路径写入缓存，便于中途重启时直接命中"""
+        replay = rs_engine.copy()
+        remaining_score = gained
+        for i, (r, c) in enumerate(path):
+            self.cache.put(replay.board, remaining_score, path[i:])
+            remaining_score -= replay.eliminate(r, c)
 
 if __name__ == "__main__":
     from game.engine import PopStarEngine
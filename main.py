@@ -12,8 +12,19 @@ import shutil
 from ai_model.predict import PopStarPredictor
 from game.engine import PopStarEngine
 from game.solver import PopStarSolver
+from game.cache import SolutionCache
 from benchmark_solver import run_benchmark
 
+# 棋盘画布边长 (像素)
+CANVAS_SIZE = 500
+# 可选的棋盘边长 (前四种有原生单态化快速路径，其余尺寸走通用引擎)
+BOARD_SIZES = (8, 10, 12, 15, 20)
+# 可选的求解策略 (名称 -> PopStarSolver 参数)，返回格式一致，可随时切换
+SOLVER_STRATEGIES = {
+    "MCTS": {},
+    "束搜索": {"strategy": "beam", "beam_width": 256},
+}
+
 class PopStarApp:
     def __init__(self, root):
         self.root = root
@@ -29,15 +40,19 @@ class PopStarApp:
             return
 
         # 2. 素材
+        self.board_size = 10
         self.assets = self._load_assets()
         
         # 3. 状态
-        self.engine = PopStarEngine(board=np.full((10, 10), -1))
+        self.engine = PopStarEngine(board=np.full((self.board_size, self.board_size), -1))
         self.roi = None
         self.last_full_img = None # 缓存上一次截取的全图
         self.planned_path = [] # 存储 AI 规划好的动作序列
         self.best_move = None
         self.is_analyzing = False
+        # 已解盘面缓存: 重复同步或重启程序时直接复用之前的解
+        self.solution_cache = SolutionCache('cache/solutions.psc')
+        self.solver_options = SOLVER_STRATEGIES["MCTS"]
 
         # 4. 性能压测与自动迭代次数调整 (固定 1 秒计算量)
         try:
@@ -56,10 +71,11 @@ class PopStarApp:
     def _load_assets(self):
         asset_map = {}
         names = ['蓝', '绿', '红', '紫', '黄']
+        cs = CANVAS_SIZE // self.board_size
         for i, name in enumerate(names):
             path = f"png/{name}.png"
             if os.path.exists(path):
-                img = Image.open(path).convert("RGBA").resize((50, 50))
+                img = Image.open(path).convert("RGBA").resize((cs, cs))
                 asset_map[i] = ImageTk.PhotoImage(img)
         return asset_map
 
@@ -74,7 +90,22 @@ class PopStarApp:
         
         ttk.Button(top_frame, text="1. 开始框选", command=self.select_roi).pack(side=tk.LEFT, padx=5)
         ttk.Button(top_frame, text="重新同步/识别", command=self.sync_board).pack(side=tk.LEFT, padx=5)
-        ttk.Button(top_frame, text="重新计算路径", command=self.recalculate).pack(side=tk.LEFT, padx=5)
+        ttk.Button(top_frame, text="重新计算路径", command=lambda: self.recalculate(refine=True)).pack(side=tk.LEFT, padx=5)
+
+        ttk.Label(top_frame, text="棋盘尺寸:").pack(side=tk.LEFT, padx=(15, 2))
+        self.size_var = tk.StringVar(value=str(self.board_size))
+        size_box = ttk.Combobox(top_frame, textvariable=self.size_var, width=4, state="readonly",
+                                values=[str(n) for n in BOARD_SIZES])
+        size_box.bind("<<ComboboxSelected>>", self.change_board_size)
+        size_box.pack(side=tk.LEFT)
+
+        ttk.Label(top_frame, text="求解策略:").pack(side=tk.LEFT, padx=(15, 2))
+        self.strategy_var = tk.StringVar(value="MCTS")
+        strategy_box = ttk.Combobox(top_frame, textvariable=self.strategy_var, width=8, state="readonly",
+                                    values=list(SOLVER_STRATEGIES))
+        strategy_box.bind("<<ComboboxSelected>>",
+                          lambda e: setattr(self, "solver_options", SOLVER_STRATEGIES[self.strategy_var.get()]))
+        strategy_box.pack(side=tk.LEFT)
         
         self.status_label = ttk.Label(top_frame, text="就绪", foreground="blue")
         self.status_label.pack(side=tk.RIGHT, padx=5)
@@ -87,7 +118,7 @@ class PopStarApp:
         self.board_frame = ttk.LabelFrame(main_content, text="游戏引擎仿真")
         self.board_frame.pack(side=tk.LEFT, padx=5, fill=tk.BOTH)
         
-        self.canvas = tk.Canvas(self.board_frame, bg="#1a1a1a", width=500, height=500, highlightthickness=0)
+        self.canvas = tk.Canvas(self.board_frame, bg="#1a1a1a", width=CANVAS_SIZE, height=CANVAS_SIZE, highlightthickness=0)
         self.canvas.pack(padx=5, pady=5)
 
         # 右侧操作区
@@ -119,6 +150,16 @@ class PopStarApp:
 
         self.render_board()
 
+    def change_board_size(self, event=None):
+        """切换棋盘尺寸: 重置棋盘并按新尺寸重新识别"""
+        self.board_size = int(self.size_var.get())
+        self.assets = self._load_assets()
+        self.engine = PopStarEngine(board=np.full((self.board_size, self.board_size), -1))
+        self.planned_path = []
+        self.best_move = None
+        self.render_board()
+        self.sync_board()
+
     def select_roi(self):
         img = self._get_screenshot()
         if not img: return
@@ -228,28 +269,22 @@ class PopStarApp:
     def _run_sync(self, use_cache):
         roi_img = self._get_roi_image(use_cache=use_cache)
         if not roi_img: return
-        w, h = roi_img.size
-        cw, ch = w / 10, h / 10
-        matrix = np.full((10, 10), -1, dtype=int)
-        for r in range(10):
-            for c in range(10):
-                cell = roi_img.crop((c * cw, r * ch, (c + 1) * cw, (r + 1) * ch))
-                v = self.predictor.predict_cell(cell)
-                matrix[r, c] = v if v < 5 else -1
+        matrix = self.predictor.predict_grid(roi_img, self.board_size, self.board_size)
         self.engine = PopStarEngine(board=matrix)
         self.planned_path = []
         self.root.after(0, self.recalculate)
 
-    def recalculate(self):
+    def recalculate(self, refine=False):
         if not self.engine.has_moves(): return
         self.status_label.config(text="AI 正在规划全局路径...")
         self.is_analyzing = True
-        threading.Thread(target=self._run_solver, daemon=True).start()
+        threading.Thread(target=self._run_solver, args=(refine,), daemon=True).start()
 
-    def _run_solver(self):
-        solver = PopStarSolver(self.engine)
+    def _run_solver(self, refine=False):
+        solver = PopStarSolver(self.engine, cache=self.solution_cache, **self.solver_options)
         # 使用动态计算的迭代次数，固定占用 1 秒 CPU 时间
-        move, score, path = solver.solve(iterations=self.solver_iterations) 
+        # 缓存命中时直接返回；手动"重新计算"时以缓存路径为下界继续搜索
+        move, score, path = solver.solve(iterations=self.solver_iterations, refine=refine)
         self.root.after(0, lambda: self._on_solver_done(move, score, path))
 
     def _on_solver_done(self, move, score, path):
@@ -272,12 +307,14 @@ class PopStarApp:
         r, c = move
         
         # 如果当前位置非法（比如由于同步误差），则重新计算
-        if self.engine.board[r, c] == -1 or len(self.engine.get_connected_group(r, c)) < 2:
+        # 空位的连通组为空集，因此只需检查连通组大小
+        group = self.engine.get_connected_group(r, c)
+        if len(group) < 2:
             print("Detected path deviation, recalculating...")
             self.recalculate()
             return
 
-        self.engine.eliminate(r, c)
+        self.engine.eliminate(r, c, known_group=group)
         self.score_label.config(text=f"积分: {self.engine.total_score}")
         
         # 更新预览图中下一个推荐位置
@@ -286,10 +323,12 @@ class PopStarApp:
 
     def render_board(self):
         self.canvas.delete("all")
-        cs = 50
-        for r in range(10):
-            for c in range(10):
-                v = self.engine.board[r, c]
+        cs = CANVAS_SIZE // self.board_size
+        # 原生引擎的 board 每次访问都会生成新数组，这里只取一次
+        board = self.engine.board
+        for r in range(self.board_size):
+            for c in range(self.board_size):
+                v = int(board[r, c])
                 x0, y0 = c * cs, r * cs
                 self.canvas.create_rectangle(x0, y0, x0+cs, y0+cs, outline="#333", fill="#222")
                 if v != -1 and v in self.assets:
@@ -0,0 +1,128 @@
+use crate::engine::GameEngine;
+use rayon::prelude::*;
+use std::collections::HashSet;
+
+/// 束搜索中的一个局面
+struct BeamState<E> {
+    engine: E,
+    path: Vec<(usize, usize)>,
+}
+
+/// 扩展产生的候选局面 (尚未拼接路径)
+struct Candidate<E> {
+    engine: E,
+    parent: usize,
+    action: (usize, usize),
+    value: f64,
+    terminal: bool,
+}
+
+/// 局面启发式估值
+///
+/// - 已获得的分数
+/// - 剩余连通组的潜力: 每组按当前大小立即消除可得的分数之和
+/// - 结束奖励估计: 某种颜色只剩 1 颗时注定无法消除，以此估算最终剩余数量
+fn evaluate<E: GameEngine>(engine: &E) -> f64 {
+    let potential: usize = engine
+        .get_all_moves()
+        .iter()
+        .map(|(_, group)| group.len() * group.len() * 5)
+        .sum();
+
+    let mut color_counts = [0usize; 5];
+    for &v in engine.cells() {
+        if (0..5).contains(&v) {
+            color_counts[v as usize] += 1;
+        }
+    }
+    let stranded = color_counts.iter().filter(|&&n| n == 1).count() as i32;
+    let bonus = (2000 - stranded * stranded * 20).max(0);
+
+    (engine.total_score() + bonus) as f64 + potential as f64
+}
+
+/// 束搜索求解器
+///
+/// 每一层扩展当前束中所有局面的全部合法动作 (多线程并行)，
+/// 同一层中重复的棋盘只保留估值最高者，再按启发式保留前 `beam_width` 个局面。
+/// 无动作可走的候选局面不进入束，加上结束奖励后直接参与最终比较。
+/// # 返回
+/// (最佳动作, 最大得分, 最佳路径)，与 MCTS 求解器一致
+///
+/// `seed`: 可选的已知路径 (如缓存中的解)，作为最终结果的下界
+pub fn beam_search<E: GameEngine>(
+    engine: E,
+    beam_width: usize,
+    seed: Option<Vec<(usize, usize)>>,
+) -> (Option<(usize, usize)>, i32, Vec<(usize, usize)>) {
+    if !engine.has_moves() {
+        return (
+            None,
+            engine.total_score() + engine.calculate_end_bonus(),
+            Vec::new(),
+        );
+    }
+
+    let (mut best_score, mut best_path) = seed
+        .and_then(|path| engine.play_path(&path).map(|score| (score, path)))
+        .unwrap_or((i32::MIN, Vec::new()));
+    let mut beam = vec![BeamState {
+        engine,
+        path: Vec::new(),
+    }];
+
+    while !beam.is_empty() {
+        // 1. 并行扩展
+        let mut candidates: Vec<Candidate<E>> = beam
+            .par_iter()
+            .enumerate()
+            .flat_map_iter(|(parent, state)| {
+                state
+                    .engine
+                    .get_all_moves()
+                    .into_iter()
+                    .map(move |((r, c), group)| {
+                        let mut next = state.engine.clone();
+                        next.eliminate(r, c, Some(group));
+                        let value = evaluate(&next);
+                        let terminal = !next.has_moves();
+                        Candidate {
+                            engine: next,
+                            parent,
+                            action: (r, c),
+                            value,
+                            terminal,
+                        }
+                    })
+            })
+            .collect();
+
+        // 2. 按估值排序: 终局直接结算，其余去重后保留前 beam_width 个
+        candidates.par_sort_unstable_by(|a, b| b.value.partial_cmp(&a.value).unwrap());
+        let mut seen = HashSet::with_capacity(beam_width);
+        let mut next_beam = Vec::with_capacity(beam_width);
+        for cand in candidates {
+            if cand.terminal {
+                let total = cand.engine.total_score() + cand.engine.calculate_end_bonus();
+                if total > best_score {
+                    best_score = total;
+                    best_path = beam[cand.parent].path.clone();
+                    best_path.push(cand.action);
+                }
+                continue;
+            }
+            if next_beam.len() >= beam_width || !seen.insert(cand.engine.board().clone()) {
+                continue;
+            }
+            let mut path = beam[cand.parent].path.clone();
+            path.push(cand.action);
+            next_beam.push(BeamState {
+                engine: cand.engine,
+                path,
+            });
+        }
+        beam = next_beam;
+    }
+
+    (best_path.first().copied(), best_score, best_path)
+}
@@ -1,56 +1,147 @@
 use rand::Rng;
+use std::hash::Hash;
 
-/// 游戏常量定义
-pub const WIDTH: usize = 10;
-pub const HEIGHT: usize = 10;
-pub const BOARD_SIZE: usize = WIDTH * HEIGHT;
+/// 原生引擎提供单态化快速路径的棋盘边长 (其余尺寸使用 `DynPopStarEngine`)
+pub const SUPPORTED_SIZES: [usize; 4] = [8, 10, 12, 15];
+
+/// 一个合法动作: (点击坐标, 对应的连通组)
+pub type Move = ((usize, usize), Vec<(usize, usize)>);
+
+/// 求解器 (MCTS / 束搜索 / 自对弈) 所需的引擎接口
+///
+/// 由编译期定长的 `PopStarEngine<W, H>` (快速路径) 与运行时尺寸的 `DynPopStarEngine` 共同实现。
+pub trait GameEngine: Clone + Send + Sync {
+    /// 可哈希的棋盘表示，用于局面去重
+    type Board: Clone + Eq + Hash + Send;
+
+    /// 随机生成指定尺寸的新局面
+    fn random(width: usize, height: usize) -> Self;
+    fn width(&self) -> usize;
+    fn height(&self) -> usize;
+    fn board(&self) -> &Self::Board;
+    /// 按行展开的棋盘
+    fn cells(&self) -> &[i8];
+    fn total_score(&self) -> i32;
+    fn get_connected_group(&self, r: usize, c: usize) -> Vec<(usize, usize)>;
+    fn get_all_moves(&self) -> Vec<Move>;
+    fn eliminate(&mut self, r: usize, c: usize, known_group: Option<Vec<(usize, usize)>>) -> i32;
+    fn get_remaining_count(&self) -> usize;
+    fn calculate_end_bonus(&self) -> i32;
+    fn has_moves(&self) -> bool;
+
+    /// 引擎自身之外的堆内存 (字节)，用于估算搜索树大小
+    fn heap_bytes(&self) -> usize {
+        0
+    }
+
+    /// 在当前局面上重放一条路径，不修改自身
+    ///
+    /// # 返回值
+    /// 路径走完后的得分 (若已无动作可走则包含结束奖励)；路径中出现非法动作时返回 `None`。
+    fn play_path(&self, path: &[(usize, usize)]) -> Option<i32> {
+        let mut engine = self.clone();
+        for &(r, c) in path {
+            if r >= self.height() || c >= self.width() || engine.eliminate(r, c, None) == 0 {
+                return None;
+            }
+        }
+        let bonus = if engine.has_moves() {
+            0
+        } else {
+            engine.calculate_end_bonus()
+        };
+        Some(engine.total_score() + bonus)
+    }
+}
+
+/// 计算最终剩余奖励 (两种引擎共用)
+fn end_bonus(count: usize) -> i32 {
+    if count >= 10 {
+        0
+    } else {
+        let bonus = 2000 - (count as i32 * count as i32 * 20);
+        if bonus > 0 { bonus } else { 0 }
+    }
+}
+
+/// 与 Python 版引擎 `__str__` 相同的文本格式: 每行以空格分隔，空位显示为 `.`
+fn fmt_cells(cells: &[i8], width: usize, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
+    for (r, row) in cells.chunks_exact(width).enumerate() {
+        if r > 0 {
+            writeln!(f)?;
+        }
+        for (c, &v) in row.iter().enumerate() {
+            if c > 0 {
+                write!(f, " ")?;
+            }
+            if v == -1 {
+                write!(f, ".")?;
+            } else {
+                write!(f, "{}", v)?;
+            }
+        }
+    }
+    Ok(())
+}
 
 /// PopStar 游戏核心引擎
 ///
 /// 负责维护游戏棋盘状态、执行消除逻辑、处理重力下落和列合并。
-/// 棋盘使用一维数组 `[i8; 100]` 表示，以优化缓存性能。
+/// 棋盘尺寸 `W` x `H` 为编译期常量，每种尺寸单独单态化，
+/// 棋盘使用连续的 `[[i8; W]; H]` 数组表示 (内存布局与一维数组相同)，以优化缓存性能。
 /// 值定义:
 /// - `-1`: 空位
 /// - `0-4`: 五种颜色
 #[derive(Clone, Debug)]
-pub struct PopStarEngine {
-    pub board: [i8; BOARD_SIZE],
+pub struct PopStarEngine<const W: usize, const H: usize> {
+    pub board: [[i8; W]; H],
     pub score: i32,
     pub total_score: i32,
 }
 
-impl PopStarEngine {
+impl<const W: usize, const H: usize> PopStarEngine<W, H> {
+    /// 格子总数
+    pub const BOARD_SIZE: usize = W * H;
+
     /// 创建一个新的游戏引擎实例
     ///
     /// # 参数
-    /// - `board`: 可选的初始棋盘数据。如果为 `None`，则随机生成。
+    /// - `board`: 可选的初始棋盘数据 (按行展开的一维数据)。如果为 `None`，则随机生成。
     pub fn new(board: Option<Vec<i8>>) -> Self {
         let mut engine = PopStarEngine {
-            board: [0; BOARD_SIZE],
+            board: [[0; W]; H],
             score: 0,
             total_score: 0,
         };
 
         if let Some(b) = board {
-            if b.len() == BOARD_SIZE {
-                engine.board.copy_from_slice(&b);
+            if b.len() == Self::BOARD_SIZE {
+                for (row, chunk) in engine.board.iter_mut().zip(b.chunks_exact(W)) {
+                    row.copy_from_slice(chunk);
+                }
             } else {
                 panic!("Invalid board size");
             }
         } else {
             // 随机初始化棋盘
             let mut rng = rand::rng();
-            for i in 0..BOARD_SIZE {
-                engine.board[i] = rng.random_range(0..5);
+            for row in engine.board.iter_mut() {
+                for cell in row.iter_mut() {
+                    *cell = rng.random_range(0..5);
+                }
             }
         }
         engine
     }
 
-    /// 获取指定坐标 (row, col) 在一维数组中的索引
-    #[inline(always)]
-    fn idx(&self, r: usize, c: usize) -> usize {
-        r * WIDTH + c
+    /// 棋盘宽度 (列数)
+    pub fn width(&self) -> usize {
+        W
+    }
+
+    /// 棋盘高度 (行数)
+    pub fn height(&self) -> usize {
+        H
     }
 
     /// 获取 (r, c) 坐标所在的同色连通区域
@@ -59,16 +150,16 @@ impl PopStarEngine {
     /// 返回一个包含所有连通块坐标的 `Vec<(usize, usize)>`。
     /// 如果该位置为空或越界，返回空集合。
     pub fn get_connected_group(&self, r: usize, c: usize) -> Vec<(usize, usize)> {
-        let color = self.board[self.idx(r, c)];
+        let color = self.board[r][c];
         if color == -1 {
             return Vec::new(); // 空位没有连通区域
         }
 
         let mut group = Vec::new();
         let mut stack = vec![(r, c)];
-        let mut visited = vec![false; BOARD_SIZE];
+        let mut visited = [[false; W]; H];
 
-        visited[self.idx(r, c)] = true;
+        visited[r][c] = true;
         group.push((r, c));
 
         while let Some((cr, cc)) = stack.pop() {
@@ -78,13 +169,12 @@ impl PopStarEngine {
                 let nr = cr as isize + dr;
                 let nc = cc as isize + dc;
 
-                if nr >= 0 && nr < HEIGHT as isize && nc >= 0 && nc < WIDTH as isize {
+                if nr >= 0 && nr < H as isize && nc >= 0 && nc < W as isize {
                     let nr = nr as usize;
                     let nc = nc as usize;
-                    let idx = self.idx(nr, nc);
 
-                    if !visited[idx] && self.board[idx] == color {
-                        visited[idx] = true;
+                    if !visited[nr][nc] && self.board[nr][nc] == color {
+                        visited[nr][nc] = true;
                         stack.push((nr, nc));
                         group.push((nr, nc));
                     }
@@ -94,6 +184,30 @@ impl PopStarEngine {
         group
     }
 
+    /// 获取当前局面的所有合法动作及其连通组
+    /// 为了优化，我们同时存储 group 数据，避免执行动作时再次 BFS
+    pub fn get_all_moves(&self) -> Vec<Move> {
+        let mut moves = Vec::new();
+        let mut visited = [[false; W]; H];
+
+        for r in 0..H {
+            for c in 0..W {
+                if self.board[r][c] != -1 && !visited[r][c] {
+                    let group = self.get_connected_group(r, c);
+                    // 标记 visited
+                    for &(gr, gc) in &group {
+                        visited[gr][gc] = true;
+                    }
+
+                    if group.len() >= 2 {
+                        moves.push(((r, c), group));
+                    }
+                }
+            }
+        }
+        moves
+    }
+
     /// 执行消除操作
     ///
     /// # 参数
@@ -108,7 +222,7 @@ impl PopStarEngine {
         c: usize,
         known_group: Option<Vec<(usize, usize)>>,
     ) -> i32 {
-        if self.board[self.idx(r, c)] == -1 {
+        if self.board[r][c] == -1 {
             return 0;
         }
 
@@ -130,8 +244,7 @@ impl PopStarEngine {
 
         // 2. 标记消除 (设为 -1)
         for (gr, gc) in group {
-            let idx = self.idx(gr, gc);
-            self.board[idx] = -1;
+            self.board[gr][gc] = -1;
         }
 
         // 3. 应用重力
@@ -147,17 +260,16 @@ impl PopStarEngine {
     ///
     /// 方块悬空时会自动掉落填补下方空位。
     fn apply_gravity(&mut self) {
-        for c in 0..WIDTH {
-            let mut write_idx = HEIGHT - 1; // 从底部开始写的指针
+        for c in 0..W {
+            let mut write_idx = H - 1; // 从底部开始写的指针
             // 从底部向上扫描
-            for r in (0..HEIGHT).rev() {
-                let idx = self.idx(r, c);
-                if self.board[idx] != -1 {
+            for r in (0..H).rev() {
+                if self.board[r][c] != -1 {
                     // 如果当前位置不是空位
                     if r != write_idx {
                         // 移动到 write_idx 位置
-                        self.board[self.idx(write_idx, c)] = self.board[idx];
-                        self.board[idx] = -1; // 原位置置空
+                        self.board[write_idx][c] = self.board[r][c];
+                        self.board[r][c] = -1; // 原位置置空
                     }
                     if write_idx > 0 {
                         write_idx -= 1;
@@ -187,11 +299,11 @@ impl PopStarEngine {
     /// 当某一列完全为空时，右侧的列整体向左移动填补。
     fn apply_column_shift(&mut self) {
         let mut write_col = 0;
-        for c in 0..WIDTH {
+        for c in 0..W {
             // 检查当前列是否全空
             let mut is_empty = true;
-            for r in 0..HEIGHT {
-                if self.board[self.idx(r, c)] != -1 {
+            for r in 0..H {
+                if self.board[r][c] != -1 {
                     is_empty = false;
                     break;
                 }
@@ -200,9 +312,9 @@ impl PopStarEngine {
             if !is_empty {
                 if c != write_col {
                     // 搬运整列
-                    for r in 0..HEIGHT {
-                        self.board[self.idx(r, write_col)] = self.board[self.idx(r, c)];
-                        self.board[self.idx(r, c)] = -1; // 原列置空
+                    for r in 0..H {
+                        self.board[r][write_col] = self.board[r][c];
+                        self.board[r][c] = -1; // 原列置空
                     }
                 }
                 write_col += 1;
@@ -210,40 +322,32 @@ impl PopStarEngine {
         }
     }
 
+    /// 获取剩余星星数量
+    pub fn get_remaining_count(&self) -> usize {
+        self.board.iter().flatten().filter(|&&v| v != -1).count()
+    }
+
     /// 计算最终剩余奖励
     pub fn calculate_end_bonus(&self) -> i32 {
-        let mut count = 0;
-        for i in 0..BOARD_SIZE {
-            if self.board[i] != -1 {
-                count += 1;
-            }
-        }
-
-        if count >= 10 {
-            0
-        } else {
-            let bonus = 2000 - (count as i32 * count as i32 * 20);
-            if bonus > 0 { bonus } else { 0 }
-        }
+        end_bonus(self.get_remaining_count())
     }
 
     /// 检查是否还有可行动作
     pub fn has_moves(&self) -> bool {
         // 横向及其邻居
-        for r in 0..HEIGHT {
-            for c in 0..WIDTH {
-                let idx = self.idx(r, c);
-                let color = self.board[idx];
+        for r in 0..H {
+            for c in 0..W {
+                let color = self.board[r][c];
                 if color == -1 {
                     continue;
                 }
 
                 // 检查右侧
-                if c + 1 < WIDTH && self.board[self.idx(r, c + 1)] == color {
+                if c + 1 < W && self.board[r][c + 1] == color {
                     return true;
                 }
                 // 检查下方
-                if r + 1 < HEIGHT && self.board[self.idx(r + 1, c)] == color {
+                if r + 1 < H && self.board[r + 1][c] == color {
                     return true;
                 }
             }
@@ -251,3 +355,271 @@ impl PopStarEngine {
         false
     }
 }
+
+impl<const W: usize, const H: usize> std::fmt::Display for PopStarEngine<W, H> {
+    fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
+        fmt_cells(self.board.as_flattened(), W, f)
+    }
+}
+
+impl<const W: usize, const H: usize> GameEngine for PopStarEngine<W, H> {
+    type Board = [[i8; W]; H];
+
+    fn random(width: usize, height: usize) -> Self {
+        assert!(width == W && height == H, "Invalid board size");
+        Self::new(None)
+    }
+
+    fn width(&self) -> usize {
+        W
+    }
+
+    fn height(&self) -> usize {
+        H
+    }
+
+    fn board(&self) -> &Self::Board {
+        &self.board
+    }
+
+    fn cells(&self) -> &[i8] {
+        self.board.as_flattened()
+    }
+
+    fn total_score(&self) -> i32 {
+        self.total_score
+    }
+
+    fn get_connected_group(&self, r: usize, c: usize) -> Vec<(usize, usize)> {
+        PopStarEngine::get_connected_group(self, r, c)
+    }
+
+    fn get_all_moves(&self) -> Vec<Move> {
+        PopStarEngine::get_all_moves(self)
+    }
+
+    fn eliminate(&mut self, r: usize, c: usize, known_group: Option<Vec<(usize, usize)>>) -> i32 {
+        PopStarEngine::eliminate(self, r, c, known_group)
+    }
+
+    fn get_remaining_count(&self) -> usize {
+        PopStarEngine::get_remaining_count(self)
+    }
+
+    fn calculate_end_bonus(&self) -> i32 {
+        PopStarEngine::calculate_end_bonus(self)
+    }
+
+    fn has_moves(&self) -> bool {
+        PopStarEngine::has_moves(self)
+    }
+}
+
+/// 运行时尺寸的通用引擎
+///
+/// 规则与 `PopStarEngine<W, H>` 完全相同，棋盘以按行展开的 `Vec<i8>` 存储，
+/// 用于 `SUPPORTED_SIZES` 以外的任意尺寸 (包括非正方形棋盘)。
+#[derive(Clone, Debug)]
+pub struct DynPopStarEngine {
+    pub board: Vec<i8>,
+    pub width: usize,
+    pub height: usize,
+    pub score: i32,
+    pub total_score: i32,
+}
+
+impl DynPopStarEngine {
+    /// 创建一个新的游戏引擎实例
+    ///
+    /// # 参数
+    /// - `board`: 可选的初始棋盘数据 (按行展开的一维数据)。如果为 `None`，则随机生成。
+    pub fn new(board: Option<Vec<i8>>, width: usize, height: usize) -> Self {
+        let board = match board {
+            Some(b) if b.len() == width * height => b,
+            Some(_) => panic!("Invalid board size"),
+            None => {
+                let mut rng = rand::rng();
+                (0..width * height)
+                    .map(|_| rng.random_range(0..5))
+                    .collect()
+            }
+        };
+        DynPopStarEngine {
+            board,
+            width,
+            height,
+            score: 0,
+            total_score: 0,
+        }
+    }
+
+    /// 按方向查找相邻格子的索引 (越界时返回 `None`)
+    fn neighbor(&self, idx: usize, dr: isize, dc: isize) -> Option<usize> {
+        let r = (idx / self.width) as isize + dr;
+        let c = (idx % self.width) as isize + dc;
+        if r >= 0 && r < self.height as isize && c >= 0 && c < self.width as isize {
+            Some(r as usize * self.width + c as usize)
+        } else {
+            None
+        }
+    }
+
+    /// 从 `start` 出发搜索同色连通区域，并在 `visited` 中标记
+    fn flood(&self, start: usize, visited: &mut [bool]) -> Vec<(usize, usize)> {
+        let color = self.board[start];
+        let mut group = vec![(start / self.width, start % self.width)];
+        let mut stack = vec![start];
+        visited[start] = true;
+
+        while let Some(idx) = stack.pop() {
+            for (dr, dc) in [(0, 1), (0, -1), (1, 0), (-1, 0)] {
+                if let Some(n) = self.neighbor(idx, dr, dc) {
+                    if !visited[n] && self.board[n] == color {
+                        visited[n] = true;
+                        stack.push(n);
+                        group.push((n / self.width, n % self.width));
+                    }
+                }
+            }
+        }
+        group
+    }
+
+    /// 应用重力下落: 每列非空方块依次压到底部
+    fn apply_gravity(&mut self) {
+        let w = self.width;
+        for c in 0..w {
+            let mut write_r = self.height;
+            for r in (0..self.height).rev() {
+                let v = self.board[r * w + c];
+                if v != -1 {
+                    write_r -= 1;
+                    if r != write_r {
+                        self.board[write_r * w + c] = v;
+                        self.board[r * w + c] = -1;
+                    }
+                }
+            }
+        }
+    }
+
+    /// 应用列左移: 全空的列由右侧列整体左移填补
+    fn apply_column_shift(&mut self) {
+        let w = self.width;
+        let mut write_col = 0;
+        for c in 0..w {
+            // 重力之后底行为空即整列为空
+            if self.board[(self.height - 1) * w + c] == -1 {
+                continue;
+            }
+            if c != write_col {
+                for r in 0..self.height {
+                    self.board[r * w + write_col] = self.board[r * w + c];
+                    self.board[r * w + c] = -1;
+                }
+            }
+            write_col += 1;
+        }
+    }
+}
+
+impl std::fmt::Display for DynPopStarEngine {
+    fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
+        fmt_cells(&self.board, self.width, f)
+    }
+}
+
+impl GameEngine for DynPopStarEngine {
+    type Board = Vec<i8>;
+
+    fn random(width: usize, height: usize) -> Self {
+        Self::new(None, width, height)
+    }
+
+    fn width(&self) -> usize {
+        self.width
+    }
+
+    fn height(&self) -> usize {
+        self.height
+    }
+
+    fn board(&self) -> &Self::Board {
+        &self.board
+    }
+
+    fn cells(&self) -> &[i8] {
+        &self.board
+    }
+
+    fn total_score(&self) -> i32 {
+        self.total_score
+    }
+
+    fn get_connected_group(&self, r: usize, c: usize) -> Vec<(usize, usize)> {
+        let idx = r * self.width + c;
+        if self.board[idx] == -1 {
+            return Vec::new();
+        }
+        self.flood(idx, &mut vec![false; self.board.len()])
+    }
+
+    fn get_all_moves(&self) -> Vec<Move> {
+        let mut moves = Vec::new();
+        let mut visited = vec![false; self.board.len()];
+        for idx in 0..self.board.len() {
+            if self.board[idx] != -1 && !visited[idx] {
+                let group = self.flood(idx, &mut visited);
+                if group.len() >= 2 {
+                    moves.push(((idx / self.width, idx % self.width), group));
+                }
+            }
+        }
+        moves
+    }
+
+    fn eliminate(&mut self, r: usize, c: usize, known_group: Option<Vec<(usize, usize)>>) -> i32 {
+        if self.board[r * self.width + c] == -1 {
+            return 0;
+        }
+        let group = match known_group {
+            Some(g) => g,
+            None => self.get_connected_group(r, c),
+        };
+        let n = group.len();
+        if n < 2 {
+            return 0;
+        }
+
+        let move_score = (n * n * 5) as i32;
+        self.score += move_score;
+        self.total_score += move_score;
+        for (gr, gc) in group {
+            self.board[gr * self.width + gc] = -1;
+        }
+        self.apply_gravity();
+        self.apply_column_shift();
+        move_score
+    }
+
+    fn get_remaining_count(&self) -> usize {
+        self.board.iter().filter(|&&v| v != -1).count()
+    }
+
+    fn calculate_end_bonus(&self) -> i32 {
+        end_bonus(self.get_remaining_count())
+    }
+
+    fn has_moves(&self) -> bool {
+        let w = self.width;
+        self.board.iter().enumerate().any(|(idx, &v)| {
+            v != -1
+                && ((idx % w + 1 < w && self.board[idx + 1] == v)
+                    || (idx + w < self.board.len() && self.board[idx + w] == v))
+        })
+    }
+
+    fn heap_bytes(&self) -> usize {
+        self.board.capacity()
+    }
+}
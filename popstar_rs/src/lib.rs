@@ -1,28 +1,176 @@
+use numpy::{PyArray1, PyArray2, PyArrayDyn, PyArrayMethods, PyUntypedArrayMethods};
+use pyo3::exceptions::{PyIndexError, PyValueError};
 use pyo3::prelude::*;
+use std::collections::HashSet;
+mod beam;
 mod engine;
+mod selfplay;
 mod solver;
 
-use engine::PopStarEngine;
-use solver::PopStarSolver;
+use engine::{DynPopStarEngine, GameEngine, PopStarEngine, SUPPORTED_SIZES};
+use solver::{PopStarSolver, SolverConfig, Strategy};
+
+/// 按棋盘尺寸选择实现的引擎
+///
+/// 常用尺寸 (`SUPPORTED_SIZES`) 都是独立的编译期特化版本，
+/// 其余任意尺寸 (含非正方形) 回退到运行时尺寸的 `DynPopStarEngine`。
+/// Python 侧通过 `width`/`height` 或棋盘形状选择。
+#[derive(Clone)]
+enum AnyEngine {
+    S8(PopStarEngine<8, 8>),
+    S10(PopStarEngine<10, 10>),
+    S12(PopStarEngine<12, 12>),
+    S15(PopStarEngine<15, 15>),
+    Dyn(DynPopStarEngine),
+}
+
+/// 对 `AnyEngine` 的每个尺寸分支执行同一段代码
+macro_rules! dispatch {
+    ($engine:expr, $e:ident => $body:expr) => {
+        match $engine {
+            AnyEngine::S8($e) => $body,
+            AnyEngine::S10($e) => $body,
+            AnyEngine::S12($e) => $body,
+            AnyEngine::S15($e) => $body,
+            AnyEngine::Dyn($e) => $body,
+        }
+    };
+}
+
+impl AnyEngine {
+    fn new(board: Option<Vec<i8>>, width: usize, height: usize) -> PyResult<Self> {
+        check_size(width, height)?;
+        if let Some(b) = &board {
+            if b.len() != width * height {
+                return Err(PyValueError::new_err(format!(
+                    "棋盘数据长度 {} 与尺寸 {}x{} 不符",
+                    b.len(),
+                    width,
+                    height
+                )));
+            }
+        }
+        match (width, height) {
+            (8, 8) => Ok(AnyEngine::S8(PopStarEngine::new(board))),
+            (10, 10) => Ok(AnyEngine::S10(PopStarEngine::new(board))),
+            (12, 12) => Ok(AnyEngine::S12(PopStarEngine::new(board))),
+            (15, 15) => Ok(AnyEngine::S15(PopStarEngine::new(board))),
+            _ => Ok(AnyEngine::Dyn(DynPopStarEngine::new(board, width, height))),
+        }
+    }
+}
+
+fn check_size(width: usize, height: usize) -> PyResult<()> {
+    if width == 0 || height == 0 {
+        return Err(PyValueError::new_err(format!(
+            "无效的棋盘尺寸 {}x{}",
+            width, height
+        )));
+    }
+    Ok(())
+}
+
+/// 将 Python 侧的棋盘 (二维数组/嵌套列表，或配合 width/height 的一维列表) 转换为原生引擎
+fn engine_from_board(
+    board: &Bound<'_, PyAny>,
+    width: Option<usize>,
+    height: Option<usize>,
+) -> PyResult<AnyEngine> {
+    // 统一交给 NumPy 转换为连续的 int8 数组，再直接读取底层内存
+    let numpy = board.py().import("numpy")?;
+    let array = numpy.call_method1("ascontiguousarray", (board, "int8"))?;
+    let array = array.downcast::<PyArrayDyn<i8>>()?;
+    let (h, w) = match array.shape() {
+        [h, w] => (*h, *w),
+        [_] => (height.unwrap_or(10), width.unwrap_or(10)),
+        _ => return Err(PyValueError::new_err("棋盘必须是一维或二维数组")),
+    };
+    if width.is_some_and(|v| v != w) || height.is_some_and(|v| v != h) {
+        return Err(PyValueError::new_err(format!(
+            "棋盘形状 {}x{} 与指定的 width/height 不符",
+            w, h
+        )));
+    }
+    let data = array.readonly().as_slice()?.to_vec();
+    AnyEngine::new(Some(data), w, h)
+}
 
 /// Python 包装类：PopStarEngine
+///
+/// 与 `game/engine.py` 中纯 Python 版 `PopStarEngine` 的接口一致，可直接替换使用。
 #[pyclass]
 struct PyPopStarEngine {
-    inner: PopStarEngine,
+    inner: AnyEngine,
+}
+
+impl PyPopStarEngine {
+    fn check_cell(&self, r: usize, c: usize) -> PyResult<()> {
+        let (w, h) = (self.get_width(), self.get_height());
+        if r < h && c < w {
+            Ok(())
+        } else {
+            Err(PyIndexError::new_err(format!(
+                "坐标 ({}, {}) 超出 {}x{} 棋盘范围",
+                r, c, w, h
+            )))
+        }
+    }
 }
 
 #[pymethods]
 impl PyPopStarEngine {
+    /// 默认棋盘尺寸 (与 Python 版引擎的类属性一致)
+    #[classattr]
+    const WIDTH: usize = 10;
+    #[classattr]
+    const HEIGHT: usize = 10;
+
+    /// `board`: 可选的初始棋盘，二维数组 (尺寸由形状决定) 或按行展开的一维列表；
+    /// 为 `None` 时按 `width`/`height` (默认 10) 随机生成
     #[new]
-    #[pyo3(signature = (board=None))]
-    fn new(board: Option<Vec<i8>>) -> Self {
-        PyPopStarEngine {
-            inner: PopStarEngine::new(board),
-        }
+    #[pyo3(signature = (board=None, width=None, height=None))]
+    fn new(
+        board: Option<&Bound<'_, PyAny>>,
+        width: Option<usize>,
+        height: Option<usize>,
+    ) -> PyResult<Self> {
+        let inner = match board {
+            Some(b) => engine_from_board(b, width, height)?,
+            None => AnyEngine::new(None, width.unwrap_or(10), height.unwrap_or(10))?,
+        };
+        Ok(PyPopStarEngine { inner })
     }
 
-    fn eliminate(&mut self, r: usize, c: usize) -> i32 {
-        self.inner.eliminate(r, c, None)
+    /// 获取 (r, c) 坐标所在的同色连通区域
+    fn get_connected_group(&self, r: usize, c: usize) -> PyResult<HashSet<(usize, usize)>> {
+        self.check_cell(r, c)?;
+        Ok(dispatch!(&self.inner, e => e.get_connected_group(r, c).into_iter().collect()))
+    }
+
+    /// 执行消除逻辑，返回本次消除得分
+    /// `known_group`: 可选的预计算连通组 (如 `get_connected_group` 的结果)
+    #[pyo3(signature = (r, c, known_group=None))]
+    fn eliminate(
+        &mut self,
+        r: usize,
+        c: usize,
+        known_group: Option<&Bound<'_, PyAny>>,
+    ) -> PyResult<i32> {
+        self.check_cell(r, c)?;
+        let group = match known_group {
+            Some(g) => {
+                let cells = g
+                    .try_iter()?
+                    .map(|item| item?.extract::<(usize, usize)>())
+                    .collect::<PyResult<Vec<_>>>()?;
+                for &(gr, gc) in &cells {
+                    self.check_cell(gr, gc)?;
+                }
+                Some(cells)
+            }
+            None => None,
+        };
+        Ok(dispatch!(&mut self.inner, e => e.eliminate(r, c, group)))
     }
 
     fn copy(&self) -> Self {
@@ -31,60 +179,246 @@ impl PyPopStarEngine {
         }
     }
 
+    /// 获取剩余星星数量
+    fn get_remaining_count(&self) -> usize {
+        dispatch!(&self.inner, e => e.get_remaining_count())
+    }
+
+    /// 计算关卡结束奖励
+    fn calculate_end_bonus(&self) -> i32 {
+        dispatch!(&self.inner, e => e.calculate_end_bonus())
+    }
+
+    /// 判断是否还有可消除的动作
+    fn has_moves(&self) -> bool {
+        dispatch!(&self.inner, e => e.has_moves())
+    }
+
+    #[getter]
+    fn get_width(&self) -> usize {
+        dispatch!(&self.inner, e => e.width())
+    }
+
+    #[getter]
+    fn get_height(&self) -> usize {
+        dispatch!(&self.inner, e => e.height())
+    }
+
+    #[getter]
+    fn get_score(&self) -> i32 {
+        dispatch!(&self.inner, e => e.score)
+    }
+
+    #[setter]
+    fn set_score(&mut self, score: i32) {
+        dispatch!(&mut self.inner, e => e.score = score)
+    }
+
     #[getter]
     fn get_total_score(&self) -> i32 {
-        self.inner.total_score
+        dispatch!(&self.inner, e => e.total_score)
+    }
+
+    #[setter]
+    fn set_total_score(&mut self, total_score: i32) {
+        dispatch!(&mut self.inner, e => e.total_score = total_score)
     }
 
+    /// 棋盘的 NumPy 副本 (H, W) int8；对其原地修改不会影响引擎，需整体赋值回 `board`
     #[getter]
-    fn get_board(&self) -> Vec<Vec<i8>> {
-        // 返回二维列表
-        let mut res = Vec::new();
-        for r in 0..10 {
-            let mut row = Vec::new();
-            for c in 0..10 {
-                row.push(self.inner.board[r * 10 + c]);
-            }
-            res.push(row);
-        }
-        res
+    fn get_board<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyArray2<i8>>> {
+        let (flat, w, h) = dispatch!(&self.inner, e => (e.cells().to_vec(), e.width(), e.height()));
+        PyArray1::from_vec(py, flat).reshape([h, w])
     }
 
-    fn has_moves(&self) -> bool {
-        self.inner.has_moves()
+    /// 整体替换棋盘 (分数保持不变)
+    #[setter]
+    fn set_board(&mut self, board: &Bound<'_, PyAny>) -> PyResult<()> {
+        let (score, total_score) = (self.get_score(), self.get_total_score());
+        self.inner = engine_from_board(board, None, None)?;
+        self.set_score(score);
+        self.set_total_score(total_score);
+        Ok(())
+    }
+
+    fn __str__(&self) -> String {
+        dispatch!(&self.inner, e => e.to_string())
     }
 }
 
 /// Python 包装类：PopStarSolver
 #[pyclass]
-struct PyPopStarSolver {}
+struct PyPopStarSolver {
+    strategy: Strategy,
+    config: SolverConfig,
+    /// 上一次求解时搜索树占用的内存估算 (字节)
+    #[pyo3(get)]
+    last_tree_bytes: usize,
+    /// 上一次求解的最高分收敛轨迹: [(迭代次数, 得分), ...] (仅 MCTS)
+    #[pyo3(get)]
+    last_trace: Vec<(usize, i32)>,
+}
 
 #[pymethods]
 impl PyPopStarSolver {
+    /// `strategy`: "mcts" (默认) 或 "beam"
+    /// `beam_width`: 束搜索的束宽
+    /// 其余 MCTS 参数含义见 `solver::SolverConfig`，默认值即最初的纯 UCB1 搜索
     #[new]
-    fn new() -> Self {
-        PyPopStarSolver {}
+    #[pyo3(signature = (
+        strategy="mcts",
+        beam_width=256,
+        exploration=100.0,
+        normalize_exploration=false,
+        rave=false,
+        rave_equivalence=1000.0,
+        widening=false,
+        widening_c=2.0,
+        widening_alpha=0.5,
+    ))]
+    #[allow(clippy::too_many_arguments)]
+    fn new(
+        strategy: &str,
+        beam_width: usize,
+        exploration: f64,
+        normalize_exploration: bool,
+        rave: bool,
+        rave_equivalence: f64,
+        widening: bool,
+        widening_c: f64,
+        widening_alpha: f64,
+    ) -> PyResult<Self> {
+        let strategy = match strategy {
+            "mcts" => Strategy::Mcts,
+            "beam" if beam_width > 0 => Strategy::Beam(beam_width),
+            "beam" => return Err(PyValueError::new_err("beam_width 必须大于 0")),
+            _ => {
+                return Err(PyValueError::new_err(format!(
+                    "未知的求解策略 {:?}，可选: \"mcts\", \"beam\"",
+                    strategy
+                )));
+            }
+        };
+        Ok(PyPopStarSolver {
+            strategy,
+            config: SolverConfig {
+                exploration,
+                normalize_exploration,
+                rave,
+                rave_equivalence,
+                widening,
+                widening_c,
+                widening_alpha,
+            },
+            last_tree_bytes: 0,
+            last_trace: Vec::new(),
+        })
     }
 
     /// 求解接口
+    /// `iterations`: MCTS 模拟次数 (束搜索忽略此参数，由 `beam_width` 控制计算量)
+    /// `seed_path`: 可选的已知路径，作为搜索的得分下界
     /// 返回: ( (r, c), predicted_score, path_list )
+    #[pyo3(signature = (engine, iterations, seed_path=None))]
     fn solve(
-        &self,
+        &mut self,
+        py: Python<'_>,
         engine: &PyPopStarEngine,
         iterations: usize,
+        seed_path: Option<Vec<(usize, usize)>>,
     ) -> PyResult<(Option<(usize, usize)>, i32, Vec<(usize, usize)>)> {
         // 创建一个新的 solver 实例处理这次请求，避免状态混淆
         // 需要 clone 引擎
-        let mut solver = PopStarSolver::new(engine.inner.clone());
-        let (move_opt, score, path) = solver.solve(iterations);
+        let inner = engine.inner.clone();
+        let strategy = self.strategy;
+        let config = self.config.clone();
+        // 求解期间释放 GIL，束搜索由 rayon 并行扩展
+        let (move_opt, score, path, tree_bytes, trace) = py.allow_threads(move || {
+            dispatch!(inner, e => match strategy {
+                Strategy::Mcts => {
+                    let mut solver = PopStarSolver::with_config(e, config);
+                    if let Some(path) = seed_path {
+                        solver.seed_path(path);
+                    }
+                    let (move_opt, score, path) = solver.solve(iterations);
+                    (move_opt, score, path, solver.tree_bytes(), solver.trace().to_vec())
+                }
+                Strategy::Beam(width) => {
+                    let (move_opt, score, path) = beam::beam_search(e, width, seed_path);
+                    (move_opt, score, path, 0, Vec::new())
+                }
+            })
+        });
+        self.last_tree_bytes = tree_bytes;
+        self.last_trace = trace;
         Ok((move_opt, score, path))
     }
 }
 
+/// 并行自对弈，生成定长二进制对局记录文件 (格式见 selfplay.rs，读取见 game/records.py)
+///
+/// `solver`: 可选的 PyPopStarSolver，沿用其求解策略 (MCTS 或束搜索) 与搜索参数
+/// 返回: 写入的对局数量
+#[pyfunction]
+#[pyo3(signature = (path, games, iterations=1000, solver=None, width=10, height=10, append=false))]
+fn generate_selfplay(
+    py: Python<'_>,
+    path: &str,
+    games: usize,
+    iterations: usize,
+    solver: Option<PyRef<'_, PyPopStarSolver>>,
+    width: usize,
+    height: usize,
+    append: bool,
+) -> PyResult<usize> {
+    check_size(width, height)?;
+    if width * height > selfplay::MAX_CELLS {
+        return Err(PyValueError::new_err(format!(
+            "对局记录格式最多支持 {} 个格子，{}x{} 棋盘过大",
+            selfplay::MAX_CELLS,
+            width,
+            height
+        )));
+    }
+    let (strategy, config) = solver
+        .map(|s| (s.strategy, s.config.clone()))
+        .unwrap_or((Strategy::Mcts, SolverConfig::default()));
+    type Generate = fn(
+        &str,
+        usize,
+        usize,
+        Strategy,
+        &SolverConfig,
+        usize,
+        usize,
+        bool,
+    ) -> std::io::Result<usize>;
+    let generate: Generate = match (width, height) {
+        (8, 8) => selfplay::generate::<PopStarEngine<8, 8>>,
+        (10, 10) => selfplay::generate::<PopStarEngine<10, 10>>,
+        (12, 12) => selfplay::generate::<PopStarEngine<12, 12>>,
+        (15, 15) => selfplay::generate::<PopStarEngine<15, 15>>,
+        _ => selfplay::generate::<DynPopStarEngine>,
+    };
+    // 生成期间释放 GIL，由 rayon 使用全部核心
+    py.allow_threads(|| {
+        generate(
+            path, games, iterations, strategy, &config, width, height, append,
+        )
+    })
+    .map_err(|e| match e.kind() {
+        // 文件头不一致与 game/records.py 的 write_records 一样抛出 ValueError
+        std::io::ErrorKind::InvalidData => PyValueError::new_err(e.to_string()),
+        _ => e.into(),
+    })
+}
+
 /// PopStar Rust 扩展模块入口
 #[pymodule]
 fn popstar_rs(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_class::<PyPopStarEngine>()?;
     m.add_class::<PyPopStarSolver>()?;
+    m.add_function(wrap_pyfunction!(generate_selfplay, m)?)?;
+    m.add("SUPPORTED_SIZES", SUPPORTED_SIZES.to_vec())?;
     Ok(())
 }
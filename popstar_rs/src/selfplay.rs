@@ -0,0 +1,197 @@
+use crate::beam;
+use crate::engine::GameEngine;
+use crate::solver::{PopStarSolver, SolverConfig, Strategy};
+use rayon::prelude::*;
+use std::fs::OpenOptions;
+use std::io::{self, BufWriter, Read, Seek, SeekFrom, Write};
+
+/// 对局记录文件格式 (小端序，定长记录，可直接 mmap)
+///
+/// 文件头 (16 字节):
+/// - `magic`: b"PSGR"
+/// - `version`: u8
+/// - `width`, `height`: u8
+/// - `max_moves`: u8，每条记录预留的最大步数 (W * H / 2)
+/// - `record_size`: u32
+/// - 保留: 4 字节
+///
+/// 每条记录 (M = max_moves):
+/// - `board`: i8[W * H]，初始棋盘 (-1 为空)
+/// - `n_moves`: u8
+/// - `moves`: u8[M]，每步点击的格子索引 r * W + c，未使用部分填 0xFF
+/// - `move_scores`: u32[M]，每步得分
+/// - `bonus`: u16，结束奖励
+/// - `total`: u32，最终总分 (含结束奖励)
+pub const MAGIC: &[u8; 4] = b"PSGR";
+pub const VERSION: u8 = 1;
+pub const HEADER_SIZE: usize = 16;
+/// 动作以 u8 格子索引存储且 0xFF 保留为填充值，因此格子总数不能超过 255
+pub const MAX_CELLS: usize = 255;
+
+/// 每批并行生成的对局数，写盘后释放，避免大批量生成时占用过多内存
+const CHUNK_GAMES: usize = 1024;
+
+/// 每条记录预留的最大步数 (每步至少消除 2 个)
+pub fn max_moves(width: usize, height: usize) -> usize {
+    width * height / 2
+}
+
+/// 单条记录的字节数
+pub fn record_size(width: usize, height: usize) -> usize {
+    let m = max_moves(width, height);
+    width * height + 1 + m + 4 * m + 2 + 4
+}
+
+fn header(width: usize, height: usize) -> [u8; HEADER_SIZE] {
+    let mut buf = [0u8; HEADER_SIZE];
+    buf[..4].copy_from_slice(MAGIC);
+    buf[4] = VERSION;
+    buf[5] = width as u8;
+    buf[6] = height as u8;
+    buf[7] = max_moves(width, height) as u8;
+    buf[8..12].copy_from_slice(&(record_size(width, height) as u32).to_le_bytes());
+    buf
+}
+
+/// 一局完整对局
+pub struct GameRecord {
+    pub board: Vec<i8>,
+    pub moves: Vec<u8>,
+    pub move_scores: Vec<u32>,
+    pub bonus: u16,
+    pub total: u32,
+}
+
+impl GameRecord {
+    /// 按定长格式追加编码到 `out`
+    fn encode(&self, width: usize, height: usize, out: &mut Vec<u8>) {
+        let m = max_moves(width, height);
+        out.extend(self.board.iter().map(|&v| v as u8));
+        out.push(self.moves.len() as u8);
+        out.extend(&self.moves);
+        out.extend(std::iter::repeat_n(0xFF, m - self.moves.len()));
+        for &s in &self.move_scores {
+            out.extend(s.to_le_bytes());
+        }
+        out.extend(std::iter::repeat_n(0, 4 * (m - self.move_scores.len())));
+        out.extend(self.bonus.to_le_bytes());
+        out.extend(self.total.to_le_bytes());
+    }
+}
+
+/// 使用求解器完整地下一局
+///
+/// 每一步都重新搜索，并以上一步规划的剩余路径作为种子，保证不会比既定规划更差。
+/// `strategy` 为束搜索时忽略 `iterations` 与 `config`。
+pub fn play_game<E: GameEngine>(
+    mut engine: E,
+    iterations: usize,
+    strategy: Strategy,
+    config: &SolverConfig,
+) -> GameRecord {
+    let board = engine.cells().to_vec();
+    let width = engine.width();
+    let mut moves = Vec::new();
+    let mut move_scores = Vec::new();
+    let mut plan: Vec<(usize, usize)> = Vec::new();
+
+    while engine.has_moves() {
+        let seed = (!plan.is_empty()).then_some(plan);
+        let (best_move, _, path) = match strategy {
+            Strategy::Mcts => {
+                let mut solver = PopStarSolver::with_config(engine.clone(), config.clone());
+                if let Some(path) = seed {
+                    solver.seed_path(path);
+                }
+                solver.solve(iterations)
+            }
+            Strategy::Beam(width) => beam::beam_search(engine.clone(), width, seed),
+        };
+        let Some((r, c)) = best_move else {
+            break;
+        };
+        let score = engine.eliminate(r, c, None);
+        moves.push((r * width + c) as u8);
+        move_scores.push(score as u32);
+        plan = path.into_iter().skip(1).collect();
+    }
+
+    let bonus = engine.calculate_end_bonus();
+    GameRecord {
+        board,
+        moves,
+        move_scores,
+        bonus: bonus as u16,
+        total: (engine.total_score() + bonus) as u32,
+    }
+}
+
+/// 并行自对弈并写入对局记录文件
+///
+/// # 参数
+/// - `path`: 输出文件
+/// - `games`: 对局数量
+/// - `iterations`: 每一步的 MCTS 模拟次数 (束搜索忽略)
+/// - `strategy`, `config`: 求解策略及 MCTS 参数
+/// - `width`, `height`: 棋盘尺寸，须与引擎类型 `E` 一致 (格子总数不超过 `MAX_CELLS`)
+/// - `append`: 为 true 且文件已存在时追加 (文件头须与当前尺寸一致)
+///
+/// # 返回
+/// 写入的对局数量
+pub fn generate<E: GameEngine>(
+    path: &str,
+    games: usize,
+    iterations: usize,
+    strategy: Strategy,
+    config: &SolverConfig,
+    width: usize,
+    height: usize,
+    append: bool,
+) -> io::Result<usize> {
+    debug_assert!(width * height <= MAX_CELLS);
+    let mut file = OpenOptions::new()
+        .read(true)
+        .write(true)
+        .create(true)
+        .truncate(!append)
+        .open(path)?;
+
+    let len = file.seek(SeekFrom::End(0))?;
+    if len == 0 {
+        file.write_all(&header(width, height))?;
+    } else {
+        let mut existing = [0u8; HEADER_SIZE];
+        file.seek(SeekFrom::Start(0))?;
+        file.read_exact(&mut existing)?;
+        if existing != header(width, height) {
+            return Err(io::Error::new(
+                io::ErrorKind::InvalidData,
+                "已有记录文件的文件头不一致 (格式或棋盘尺寸不同)",
+            ));
+        }
+        // 丢弃上次写入中断留下的残缺记录
+        let size = record_size(width, height) as u64;
+        let complete = (len - HEADER_SIZE as u64) / size * size + HEADER_SIZE as u64;
+        file.set_len(complete)?;
+        file.seek(SeekFrom::End(0))?;
+    }
+
+    let mut writer = BufWriter::new(file);
+    let mut written = 0;
+    while written < games {
+        let n = CHUNK_GAMES.min(games - written);
+        let records: Vec<GameRecord> = (0..n)
+            .into_par_iter()
+            .map(|_| play_game(E::random(width, height), iterations, strategy, config))
+            .collect();
+
+        let mut buf = Vec::with_capacity(n * record_size(width, height));
+        for record in &records {
+            record.encode(width, height, &mut buf);
+        }
+        writer.write_all(&buf)?;
+        written += n;
+    }
+    writer.flush()?;
+    Ok(written)
+}
@@ -1,21 +1,77 @@
-use crate::engine::PopStarEngine;
+use crate::engine::{GameEngine, Move};
 use rand::seq::IndexedRandom;
 use std::f64;
 
+/// MCTS 搜索参数
+///
+/// 默认值与最初的纯 UCB1 实现一致 (C = 100, 不启用 RAVE 与渐进展开)。
+#[derive(Clone, Debug)]
+pub struct SolverConfig {
+    /// UCB 探索系数 C
+    pub exploration: f64,
+    /// 为 true 时探索项按已观测得分区间 (max - min) 缩放，
+    /// 此时 `exploration` 为相对值 (如 0.3)，不再依赖具体的得分规模
+    pub normalize_exploration: bool,
+    /// 是否启用 RAVE (All-Moves-As-First) 统计
+    pub rave: bool,
+    /// RAVE 等价参数 k: beta = sqrt(k / (3n + k))，n 为子节点访问次数
+    pub rave_equivalence: f64,
+    /// 是否启用渐进展开 (按连通组从大到小依次展开子节点)
+    pub widening: bool,
+    /// 渐进展开: 允许的子节点数 = ceil(widening_c * visits ^ widening_alpha)
+    pub widening_c: f64,
+    pub widening_alpha: f64,
+}
+
+/// 求解策略
+#[derive(Clone, Copy, Debug)]
+pub enum Strategy {
+    /// 蒙特卡洛树搜索 (参数见 `SolverConfig`)
+    Mcts,
+    /// 束搜索 (见 beam.rs)，参数为束宽
+    Beam(usize),
+}
+
+impl Default for SolverConfig {
+    fn default() -> Self {
+        SolverConfig {
+            exploration: 100.0,
+            normalize_exploration: false,
+            rave: false,
+            rave_equivalence: 1000.0,
+            widening: false,
+            widening_c: 2.0,
+            widening_alpha: 0.5,
+        }
+    }
+}
+
 /// MCTS 节点结构
-struct Node {
-    engine: PopStarEngine,
+struct Node<E: GameEngine> {
+    engine: E,
     parent: Option<usize>,          // 父节点索引 (在 Arena 中的索引)
     children: Vec<usize>,           // 子节点索引列表
     action: Option<(usize, usize)>, // 到达此节点的动作
     visits: u32,
     value: f64,
-    untried_actions: Vec<((usize, usize), Vec<(usize, usize)>)>, // (action, group)
+    untried_actions: Vec<Move>, // (action, group)
+    // AMAF 统计 (visits, value)，按格子索引 r * width + c 存放，由所有子节点共享
+    // 仅在启用 RAVE 且节点已有子节点时分配
+    amaf: Vec<(u32, f64)>,
 }
 
-impl Node {
-    fn new(engine: PopStarEngine, parent: Option<usize>, action: Option<(usize, usize)>) -> Self {
-        let untried = Self::get_all_moves(&engine);
+impl<E: GameEngine> Node<E> {
+    fn new(
+        engine: E,
+        parent: Option<usize>,
+        action: Option<(usize, usize)>,
+        order_by_size: bool,
+    ) -> Self {
+        let mut untried = engine.get_all_moves();
+        if order_by_size {
+            // 升序排列，pop() 时优先取出最大的连通组
+            untried.sort_by_key(|(_, group)| group.len());
+        }
         Node {
             engine,
             parent,
@@ -24,47 +80,54 @@ impl Node {
             visits: 0,
             value: 0.0,
             untried_actions: untried,
+            amaf: Vec::new(),
         }
     }
-
-    /// 获取当前局面的所有合法动作及其连通组
-    /// 为了优化，我们同时存储 group 数据，避免 expand 时再次 BFS
-    fn get_all_moves(engine: &PopStarEngine) -> Vec<((usize, usize), Vec<(usize, usize)>)> {
-        let mut moves = Vec::new();
-        let mut visited = [false; 100];
-
-        for r in 0..10 {
-            for c in 0..10 {
-                let idx = r * 10 + c;
-                if engine.board[idx] != -1 && !visited[idx] {
-                    let group = engine.get_connected_group(r, c);
-                    // 标记 visited
-                    for &(gr, gc) in &group {
-                        visited[gr * 10 + gc] = true;
-                    }
-
-                    if group.len() >= 2 {
-                        moves.push(((r, c), group));
-                    }
-                }
-            }
-        }
-        moves
-    }
 }
 
 /// MCTS 求解器
-pub struct PopStarSolver {
-    nodes: Vec<Node>, // 使用 Arena 方式存储节点，避免自引用生命周期地狱
+pub struct PopStarSolver<E: GameEngine> {
+    nodes: Vec<Node<E>>, // 使用 Arena 方式存储节点，避免自引用生命周期地狱
     root_idx: usize,
+    seed: Option<(i32, Vec<(usize, usize)>)>, // 预置的已知解 (得分下界, 路径)
+    config: SolverConfig,
+    score_min: f64, // 已观测到的最低/最高得分 (相对根节点)，用于归一化探索系数
+    score_max: f64,
+    trace: Vec<(usize, i32)>, // 每次刷新最高分时的 (迭代次数, 得分)
 }
 
-impl PopStarSolver {
-    pub fn new(engine: PopStarEngine) -> Self {
-        let root = Node::new(engine, None, None);
+impl<E: GameEngine> PopStarSolver<E> {
+    pub fn with_config(engine: E, config: SolverConfig) -> Self {
+        let root = Node::new(engine, None, None, config.widening);
         PopStarSolver {
             nodes: vec![root],
             root_idx: 0,
+            seed: None,
+            config,
+            score_min: f64::INFINITY,
+            score_max: f64::NEG_INFINITY,
+            trace: Vec::new(),
+        }
+    }
+
+    /// 最高分的收敛轨迹: 每次刷新最高分时记录 (迭代次数, 得分)
+    /// 种子路径记为第 0 次迭代
+    pub fn trace(&self) -> &[(usize, i32)] {
+        &self.trace
+    }
+
+    /// 使用已知路径 (如缓存中的解) 作为搜索的得分下界
+    ///
+    /// 路径会在根局面上重放校验，若中途出现非法动作则忽略该种子。
+    /// # 返回
+    /// 种子是否被采纳
+    pub fn seed_path(&mut self, path: Vec<(usize, usize)>) -> bool {
+        match self.nodes[self.root_idx].engine.play_path(&path) {
+            Some(score) => {
+                self.seed = Some((score, path));
+                true
+            }
+            None => false,
         }
     }
 
@@ -77,16 +140,21 @@ impl PopStarSolver {
         &mut self,
         iterations: usize,
     ) -> (Option<(usize, usize)>, i32, Vec<(usize, usize)>) {
-        let mut max_score_found = 0;
-        let mut best_path_found = Vec::new();
+        let (mut max_score_found, mut best_path_found) = match self.seed.take() {
+            Some((score, path)) => {
+                self.trace.push((0, score));
+                (score, path)
+            }
+            None => (0, Vec::new()),
+        };
 
-        for _ in 0..iterations {
+        for iter in 0..iterations {
             let mut node_idx = self.root_idx;
 
-            // 1. 选择 (Select): 选择直到叶子节点或还有未尝试动作的节点
+            // 1. 选择 (Select): 选择直到叶子节点或还可以展开的节点
             loop {
                 let node = &self.nodes[node_idx];
-                if !node.untried_actions.is_empty() {
+                if self.can_expand(node) {
                     break;
                 }
                 if node.children.is_empty() {
@@ -99,14 +167,19 @@ impl PopStarSolver {
             // 2. 扩展 (Expand): 如果有未尝试动作，展开一个新节点
             let mut curr_idx = node_idx;
             // 只是为了借用检查，这里稍微绕一下
-            let has_untried = !self.nodes[curr_idx].untried_actions.is_empty();
+            let has_untried = self.can_expand(&self.nodes[curr_idx]);
 
             if has_untried {
                 let ((r, c), group) = self.nodes[curr_idx].untried_actions.pop().unwrap();
                 let mut next_engine = self.nodes[curr_idx].engine.clone();
                 next_engine.eliminate(r, c, Some(group));
 
-                let new_node = Node::new(next_engine, Some(curr_idx), Some((r, c)));
+                let new_node = Node::new(
+                    next_engine,
+                    Some(curr_idx),
+                    Some((r, c)),
+                    self.config.widening,
+                );
                 let new_idx = self.nodes.len();
                 self.nodes.push(new_node);
                 self.nodes[curr_idx].children.push(new_idx);
@@ -120,10 +193,19 @@ impl PopStarSolver {
 
             // 检查是否发现新的历史最高分 (当前节点得分 + 模拟增量 + 结束奖励)
             // sim_delta 已经包含了模拟过程中的得分 + 结束奖励
-            let current_total = self.nodes[curr_idx].engine.total_score + sim_delta;
+            let current_total = self.nodes[curr_idx].engine.total_score() + sim_delta;
+            let score_delta =
+                (current_total - self.nodes[self.root_idx].engine.total_score()) as f64;
+            self.score_min = self.score_min.min(score_delta);
+            self.score_max = self.score_max.max(score_delta);
+
+            if self.config.rave {
+                self.update_amaf(curr_idx, &context_path, score_delta);
+            }
 
             if current_total > max_score_found {
                 max_score_found = current_total;
+                self.trace.push((iter + 1, current_total));
                 // 重建路径: root -> curr -> sim_path
                 let mut path = self.reconstruct_path(curr_idx);
                 path.extend(context_path);
@@ -131,7 +213,6 @@ impl PopStarSolver {
             }
 
             // 4. 回溯 (Backpropagate): 回溯更新
-            let score_delta = (current_total - self.nodes[self.root_idx].engine.total_score) as f64;
             self.backpropagate(curr_idx, score_delta);
         }
 
@@ -141,38 +222,126 @@ impl PopStarSolver {
         (best_action, max_score_found, final_path)
     }
 
-    /// 使用 UCB 公式选择最佳子节点
+    /// 估算搜索树占用的内存 (字节)，包含节点本身及其子节点/未尝试动作列表的堆内存
+    pub fn tree_bytes(&self) -> usize {
+        let node_bytes = self.nodes.capacity() * std::mem::size_of::<Node<E>>();
+        let heap_bytes: usize = self
+            .nodes
+            .iter()
+            .map(|n| {
+                n.engine.heap_bytes()
+                    + n.children.capacity() * std::mem::size_of::<usize>()
+                    + n.untried_actions.capacity() * std::mem::size_of::<Move>()
+                    + n.untried_actions
+                        .iter()
+                        .map(|(_, g)| g.capacity() * std::mem::size_of::<(usize, usize)>())
+                        .sum::<usize>()
+                    + n.amaf.capacity() * std::mem::size_of::<(u32, f64)>()
+            })
+            .sum();
+        node_bytes + heap_bytes
+    }
+
+    /// 节点当前是否允许展开新的子节点
+    ///
+    /// 启用渐进展开时，子节点数量受访问次数限制，未达到上限前只在已有子节点中选择。
+    fn can_expand(&self, node: &Node<E>) -> bool {
+        if node.untried_actions.is_empty() {
+            return false;
+        }
+        if !self.config.widening {
+            return true;
+        }
+        let limit = self.config.widening_c * (node.visits as f64).powf(self.config.widening_alpha);
+        node.children.len() < (limit.ceil() as usize).max(1)
+    }
+
+    /// 使用 UCB 公式选择最佳子节点 (启用 RAVE 时混合 AMAF 估值)
     fn best_ucb_child(&self, parent_idx: usize) -> usize {
         let parent = &self.nodes[parent_idx];
         let log_n = (parent.visits as f64).ln();
 
         // 调整探索系数以适应游戏得分规模 (平均得分为几百到几千)
-        // 使用较大的 C 值 (如 100.0) 以鼓励在早期探索
-        let c = 100.0;
+        // 默认使用较大的 C 值 (100.0) 以鼓励在早期探索；
+        // 归一化时按已观测的得分区间缩放，使同一个 C 适用于不同尺寸/难度的棋盘
+        let c = if self.config.normalize_exploration {
+            self.config.exploration * (self.score_max - self.score_min).max(1.0)
+        } else {
+            self.config.exploration
+        };
+        let k = self.config.rave_equivalence;
+        let width = parent.engine.width();
+
+        let ucb = |idx: usize| {
+            let node = &self.nodes[idx];
+            let visits = node.visits as f64;
+            let mut q = node.value / visits;
+            if let Some((ar, ac)) = node.action.filter(|_| !parent.amaf.is_empty()) {
+                let (amaf_visits, amaf_value) = parent.amaf[ar * width + ac];
+                if amaf_visits > 0 {
+                    let beta = (k / (3.0 * visits + k)).sqrt();
+                    q = (1.0 - beta) * q + beta * amaf_value / amaf_visits as f64;
+                }
+            }
+            q + c * (log_n / visits).sqrt()
+        };
 
         *parent
             .children
             .iter()
-            .max_by(|&&a_idx, &&b_idx| {
-                let a = &self.nodes[a_idx];
-                let b = &self.nodes[b_idx];
-
-                let ucb_a = a.value / (a.visits as f64) + c * (log_n / a.visits as f64).sqrt();
-                let ucb_b = b.value / (b.visits as f64) + c * (log_n / b.visits as f64).sqrt();
-                ucb_a.partial_cmp(&ucb_b).unwrap()
-            })
+            .max_by(|&&a_idx, &&b_idx| ucb(a_idx).partial_cmp(&ucb(b_idx)).unwrap())
             .unwrap()
     }
 
+    /// 更新 AMAF 统计
+    ///
+    /// 对回溯路径上的每个节点，其后 (树内 + 模拟) 出现过的每个动作都视作"首步"累计一次结果，
+    /// 存放在该节点的共享表中，供其所有子节点在选择时查询。
+    fn update_amaf(&mut self, leaf_idx: usize, sim_path: &[(usize, usize)], result: f64) {
+        let root = &self.nodes[self.root_idx].engine;
+        let (width, cells) = (root.width(), root.width() * root.height());
+        let mut seen = vec![false; cells];
+        let mut later = Vec::new();
+        for &(r, c) in sim_path {
+            if !seen[r * width + c] {
+                seen[r * width + c] = true;
+                later.push((r, c));
+            }
+        }
+
+        let mut curr = Some(leaf_idx);
+        while let Some(idx) = curr {
+            let node = &mut self.nodes[idx];
+            if !node.children.is_empty() && !later.is_empty() {
+                if node.amaf.is_empty() {
+                    node.amaf = vec![(0, 0.0); cells];
+                }
+                for &(r, c) in &later {
+                    let stat = &mut node.amaf[r * width + c];
+                    stat.0 += 1;
+                    stat.1 += result;
+                }
+            }
+            // 当前节点的动作对其父节点而言也是"之后出现的动作"
+            if let Some((r, c)) = node.action {
+                if !seen[r * width + c] {
+                    seen[r * width + c] = true;
+                    later.push((r, c));
+                }
+            }
+            curr = node.parent;
+        }
+    }
+
     /// 随机模拟
     /// 返回 (模拟获得的额外分数 + 结束奖励, 模拟的路径)
-    fn simulate(&self, engine: &mut PopStarEngine) -> (i32, Vec<(usize, usize)>) {
-        let initial_score = engine.total_score;
+    fn simulate(&self, engine: &mut E) -> (i32, Vec<(usize, usize)>) {
+        let initial_score = engine.total_score();
         let mut path = Vec::new();
         let mut rng = rand::rng();
 
         loop {
-            let moves = Node::get_all_moves(engine);
+            let moves = engine.get_all_moves();
             if moves.is_empty() {
                 break;
             }
@@ -194,7 +363,7 @@ impl PopStarSolver {
         }
 
         let end_bonus = engine.calculate_end_bonus();
-        let total = engine.total_score + end_bonus;
+        let total = engine.total_score() + end_bonus;
         (total - initial_score, path)
     }
 
@@ -222,7 +391,7 @@ impl PopStarSolver {
     }
 }
 
-impl PopStarSolver {
+impl<E: GameEngine> PopStarSolver<E> {
     /// 获取最终推荐。
     /// 对于单人益智游戏，首选全盘搜索到的历史最佳路径的第一步。
     fn get_final_recommendation(
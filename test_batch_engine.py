@@ -0,0 +1,52 @@
+import numpy as np
+
+from game.engine import BatchPopStarEngine, PopStarEngine
+from game.playout import move_mask, random_cell
+
+
+def _check_parity(batch, rng):
+    engines = [batch.engine(i) for i in range(len(batch))]
+
+    while batch.has_moves().any():
+        # 连通区域与单棋盘引擎一致
+        sizes = batch.group_sizes()
+        for i, engine in enumerate(engines):
+            for r, c in zip(*np.nonzero(engine.board != -1)):
+                assert sizes[i, r, c] == len(engine.get_connected_group(r, c))
+
+        # 每个棋盘随机选择一个可消除位置 (无动作的棋盘点击 (0, 0) 应保持不变)
+        mask = batch.move_mask()
+        rows = np.zeros(len(batch), dtype=int)
+        cols = np.zeros(len(batch), dtype=int)
+        for i in range(len(batch)):
+            assert np.array_equal(mask[i], move_mask(engines[i]))
+            cell = random_cell(mask[i], rng)
+            if cell is not None:
+                rows[i], cols[i] = cell
+
+        scores = batch.eliminate(rows, cols)
+        for i, engine in enumerate(engines):
+            assert scores[i] == engine.eliminate(rows[i], cols[i])
+            assert np.array_equal(batch.boards[i], engine.board)
+
+    for i, engine in enumerate(engines):
+        assert not engine.has_moves()
+        assert batch.total_score[i] == engine.total_score
+        assert batch.calculate_end_bonus()[i] == engine.calculate_end_bonus()
+
+
+def test_batch_parity():
+    _check_parity(BatchPopStarEngine(n=64), np.random.default_rng(0))
+
+
+def test_batch_parity_sizes():
+    # 非默认尺寸 (含非正方形) 的棋盘
+    rng = np.random.default_rng(1)
+    for width, height in [(8, 8), (15, 15), (12, 9)]:
+        _check_parity(BatchPopStarEngine(n=8, width=width, height=height), rng)
+
+
+if __name__ == "__main__":
+    test_batch_parity()
+    test_batch_parity_sizes()
+    print("批量引擎与单棋盘引擎结果一致。")
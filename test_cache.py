@@ -0,0 +1,58 @@
+import os
+import tempfile
+
+import numpy as np
+
+from game.cache import SolutionCache, canonical_key
+
+
+def test_canonical_key():
+    board = np.random.randint(0, 5, (10, 10))
+    # 颜色整体置换后应得到相同的哈希
+    permuted = np.array([3, 1, 4, 0, 2])[board]
+    assert canonical_key(board) == canonical_key(permuted)
+
+    other = board.copy()
+    other[0, 0] = -1
+    assert canonical_key(board) != canonical_key(other)
+
+
+def test_solution_cache():
+    board = np.random.randint(0, 5, (10, 10))
+    path = [(9, 0), (8, 3), (9, 9)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = os.path.join(tmp, "solutions.psc")
+
+        with SolutionCache(store, capacity=2) as cache:
+            assert cache.get(board) is None
+            assert cache.put(board, 1200, path)
+            # 合并策略: 更差的结果不覆盖
+            assert not cache.put(board, 800, path[:1])
+            assert cache.get(board) == (1200, path)
+            assert cache.put(board, 1500, path[:2])
+
+            # 挤出 LRU 后从磁盘读取
+            for _ in range(3):
+                cache.put(np.random.randint(0, 5, (10, 10)), 100, path)
+            assert cache.get(board) == (1500, path[:2])
+
+        # 重新打开后通过磁盘索引命中最优记录
+        with SolutionCache(store) as cache:
+            assert len(cache) == 4
+            assert cache.get(board) == (1500, path[:2])
+
+        # 模拟写入中断: 残缺的尾部记录应被丢弃
+        with open(store, "ab") as f:
+            f.write(b"\x00" * 7)
+        with SolutionCache(store) as cache:
+            assert cache.get(board) == (1500, path[:2])
+            assert cache.put(board, 1600, path)
+        with SolutionCache(store) as cache:
+            assert cache.get(board) == (1600, path)
+
+
+if __name__ == "__main__":
+    test_canonical_key()
+    test_solution_cache()
+    print("缓存测试通过。")
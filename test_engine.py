@@ -1,5 +1,7 @@
-from game.engine import PopStarEngine
+from game.engine import PopStarEngine, PurePopStarEngine
+from game.playout import random_moves
 import numpy as np
+import pytest
 
 def test_engine():
     # 创建一个特定的测试场景
@@ -32,5 +34,30 @@ def test_engine():
     else:
         print("无动可走。结束奖励:", engine.calculate_end_bonus())
 
+def test_native_parity():
+    """Rust 引擎 (若已编译) 与纯 Python 引擎逐步结果一致"""
+    if PopStarEngine is PurePopStarEngine:
+        pytest.skip("未编译 Rust 扩展 popstar_rs")
+
+    rng = np.random.default_rng(0)
+    # 10x10 走单态化快速路径，12x9 与 20x20 走运行时尺寸的通用引擎
+    for shape in [(10, 10)] * 20 + [(12, 9)] * 5 + [(20, 20)] * 2:
+        board = rng.integers(0, 5, shape)
+        native = PopStarEngine(board=board)
+        pure = PurePopStarEngine(board=board)
+        for r, c in random_moves(pure, rng):
+            assert native.has_moves()
+            group = native.get_connected_group(r, c)
+            assert group == pure.get_connected_group(r, c)
+            assert native.eliminate(r, c, known_group=group) == pure.eliminate(r, c)
+            assert np.array_equal(native.board, pure.board)
+            assert str(native) == str(pure)
+        assert not native.has_moves()
+        assert native.get_remaining_count() == pure.get_remaining_count()
+        assert native.calculate_end_bonus() == pure.calculate_end_bonus()
+        assert native.total_score == pure.total_score
+        assert native.copy().total_score == pure.copy().total_score
+
 if __name__ == "__main__":
     test_engine()
+    test_native_parity()